@@ -1,10 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+import http.cookiejar
 import requests
 import os
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
+# Shared session so the token exchange and userinfo calls reuse pooled
+# keep-alive connections to Salesforce instead of a new TLS handshake each.
+# It serves every user's callback, so it must never store or send cookies.
+_http = requests.Session()
+_http.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
 @router.get("/oauth-config")
 async def get_oauth_config():
     """Get OAuth configuration for frontend"""
@@ -81,7 +88,7 @@ async def handle_oauth_callback(data: OAuthCallback):
         
         # Exchange code for access token
         try:
-            token_response = requests.post(token_url, token_request_data)
+            token_response = _http.post(token_url, token_request_data)
             token_response.raise_for_status()  # This will raise an exception with the response content
         except requests.exceptions.RequestException as e:
             error_msg = str(e)
@@ -100,8 +107,8 @@ async def handle_oauth_callback(data: OAuthCallback):
         instance_url = token_data['instance_url']
         
         # Get user info
-        user_response = requests.get(f"{instance_url}/services/oauth2/userinfo", 
-                                   headers={'Authorization': f'Bearer {access_token}'})
+        user_response = _http.get(f"{instance_url}/services/oauth2/userinfo", 
+                                 headers={'Authorization': f'Bearer {access_token}'})
         
         if not user_response.ok:
             raise HTTPException(status_code=400, detail="Failed to get user info")
@@ -72,13 +72,15 @@ async def get_interactions_by_case(caseId: str, maxRows: int = Query(50, ge=1, l
 async def create_interaction_summary(request: InteractionSummaryRequest):
     """Create an interaction summary record in Salesforce"""
     try:
-        logger.info(f"Received interaction summary request: {request.dict()}")
+        payload = request.model_dump()
+        logger.info("Received interaction summary request for record %s", payload.get('RelatedRecordId'))
+        logger.debug("Interaction summary request: %s", payload)
         
         # Import here to avoid startup issues
         from ..salesforce.interaction_summary_service import InteractionSummaryService
         
         service = InteractionSummaryService()
-        interaction_id = service.create_interaction_summary(request.dict())
+        interaction_id = service.create_interaction_summary(payload)
         return {"id": interaction_id, "success": True}
         
     except Exception as e:
@@ -1,5 +1,5 @@
 # server/app/api/interview_templates.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List
 import logging
 
@@ -12,9 +12,9 @@ async def get_mobile_available_templates():
     try:
         logger.info("API request: Fetching mobile-available interview templates")
         
-        from ..salesforce.interview_template_service import InterviewTemplateService
+        from ..salesforce.interview_template_service import get_interview_template_service
         
-        service = InterviewTemplateService()
+        service = get_interview_template_service()
         templates = service.get_mobile_available_templates()
         
         logger.info(f"API response: Returning {len(templates)} templates")
@@ -29,18 +29,62 @@ async def get_mobile_available_templates():
         raise HTTPException(status_code=500, detail=f"Failed to fetch templates: {str(e)}")
 
 
+@router.get("/interview-templates/mobile-available/with-questions")
+async def get_mobile_templates_with_questions():
+    """Get mobile-available interview templates with their questions in one request"""
+    try:
+        logger.info("API request: Fetching mobile-available interview templates with questions")
+        
+        from ..salesforce.interview_template_service import get_interview_template_service
+        
+        service = get_interview_template_service()
+        templates = service.get_mobile_templates_with_questions()
+        
+        return {
+            "success": True,
+            "templates": templates,
+            "count": len(templates)
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch mobile-available templates with questions: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch templates: {str(e)}")
+
+
+@router.get("/interview-templates/questions")
+async def get_questions_for_templates(ids: List[str] = Query(..., min_length=1, max_length=200)):
+    """Get interview questions for several template versions in one request, keyed by version id"""
+    try:
+        logger.info("API request: Fetching questions for %s template versions", len(ids))
+        
+        from ..salesforce.interview_template_service import get_interview_template_service
+        
+        service = get_interview_template_service()
+        questions = await service.get_questions_for_templates(ids)
+        
+        return {
+            "success": True,
+            "questions": questions,
+            "count": sum(len(items) for items in questions.values())
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch questions for template versions {ids}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+
+
 @router.get("/interview-templates/{template_version_id}/questions")
 async def get_questions_for_template(template_version_id: str):
     """Get all interview questions for a specific template version"""
     try:
         logger.info(f"API request: Fetching questions for template version: {template_version_id}")
         
-        from ..salesforce.interview_template_service import InterviewTemplateService
+        from ..salesforce.interview_template_service import get_interview_template_service
         
         if not template_version_id or template_version_id.strip() == "":
             raise HTTPException(status_code=400, detail="template_version_id is required")
         
-        service = InterviewTemplateService()
+        service = get_interview_template_service()
         questions = service.get_questions_for_template(template_version_id)
         
         logger.info(f"API response: Returning {len(questions)} questions")
@@ -55,3 +99,46 @@ async def get_questions_for_template(template_version_id: str):
     except Exception as e:
         logger.error(f"Failed to fetch questions for template version {template_version_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+
+
+@router.get("/interview-templates/{template_version_id}/question-summaries")
+async def get_question_summaries_for_template(template_version_id: str):
+    """Get lightweight question summaries (id, text, required, order) for a template version"""
+    try:
+        from ..salesforce.interview_template_service import get_interview_template_service
+        
+        service = get_interview_template_service()
+        questions = service.get_question_summaries_for_template(template_version_id)
+        
+        return {
+            "success": True,
+            "questions": questions,
+            "count": len(questions)
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch question summaries for template version {template_version_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
+
+
+@router.get("/interview-questions/{question_id}")
+async def get_question(question_id: str):
+    """Get one interview question with all of its fields"""
+    try:
+        from ..salesforce.interview_template_service import get_interview_template_service
+        
+        service = get_interview_template_service()
+        question = service.get_question(question_id)
+        if question is None:
+            raise HTTPException(status_code=404, detail="Question not found")
+        
+        return {
+            "success": True,
+            "question": question
+        }
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Failed to fetch question {question_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch question: {str(e)}")
@@ -17,6 +17,11 @@ logger = logging.getLogger("outreach")
 
 router = APIRouter(tags=["outreach"])
 
+@router.on_event("shutdown")
+async def _close_geocode_client():
+    from ..salesforce.intake_service import close_geocode_client
+    await close_geocode_client()
+
 class PersonAccountPayload(BaseModel):
     firstName: str
     lastName: str
@@ -132,7 +137,7 @@ async def create_quick_person_account(payload: PersonAccountPayload):
                 finally:
                     db_session.close()
             
-            person_data = payload.dict()
+            person_data = payload.model_dump()
             person_data["uuid"] = local_id
             person_data["createdByUserId"] = user_context.get("sfUserId")
             sf_id = create_person_account(person_data)
@@ -256,10 +261,11 @@ async def submit_outreach_encounter(payload: OutreachEncounterPayload):
                 "createdByUserId": user_context.get("sfUserId")
             }
             
-            logger.info(f"Calling ingest_encounter with payload: {apex_payload}")
+            logger.info("Calling ingest_encounter for encounter %s", apex_payload["encounterUuid"])
+            logger.debug("ingest_encounter payload: %s", apex_payload)
             
             result = ingest_encounter(apex_payload)
-            logger.info(f"Ingest encounter result: {result}")
+            logger.debug("Ingest encounter result: %s", result)
             
             # Mark as synced
             db = DuckClient()
@@ -432,9 +438,9 @@ async def create_new_client_intake(payload: dict):
         
         # Try to sync to Salesforce if online
         try:
-            from ..salesforce.intake_service import process_full_intake
+            from ..salesforce.intake_service import process_full_intake_async
             
-            result = process_full_intake(payload)
+            result = await process_full_intake_async(payload)
             
             # Mark as synced
             db = DuckClient()
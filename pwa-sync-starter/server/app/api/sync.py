@@ -29,17 +29,16 @@ class Mutation(BaseModel):
 
 def get_device_user(device_id: str, db: Session) -> dict:
     """Get user context for device from registration"""
-    from ..models.db import get_db as get_sqlite_db
-    sqlite_db = get_sqlite_db()
+    from ..models.db import device_db
     
     logger.info(f"Looking up device registration for: {device_id}")
-    result = sqlite_db.execute("""
-        SELECT user_id, sf_user_id FROM device_registrations 
-        WHERE device_id = ?
-    """, (device_id,)).fetchone()
+    with device_db() as sqlite_db:
+        result = sqlite_db.execute("""
+            SELECT user_id, sf_user_id FROM device_registrations 
+            WHERE device_id = ?
+        """, (device_id,)).fetchone()
     
     logger.info(f"Device registration query result: {result}")
-    sqlite_db.close()
     
     if result:
         user_context = {"userId": result[0], "sfUserId": result[1]}
@@ -455,27 +454,14 @@ class DeviceRegistration(BaseModel):
 def register_device(data: DeviceRegistration, db: Session = Depends(get_db)):
     """Register a device with user context for proper CreatedBy tracking"""
     try:
-        from ..models.db import get_db as get_sqlite_db
-        sqlite_db = get_sqlite_db()
+        from ..models.db import device_db
         
-        # Create device_registrations table if it doesn't exist
-        sqlite_db.execute("""
-            CREATE TABLE IF NOT EXISTS device_registrations (
-                device_id TEXT PRIMARY KEY,
-                user_id TEXT,
-                sf_user_id TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Insert or update device registration
-        sqlite_db.execute("""
-            INSERT OR REPLACE INTO device_registrations (device_id, user_id, sf_user_id)
-            VALUES (?, ?, ?)
-        """, (data.deviceId, data.userId, data.sfUserId))
-        
-        sqlite_db.commit()
-        sqlite_db.close()
+        # Insert or update device registration (table is created by get_db)
+        with device_db() as sqlite_db:
+            sqlite_db.execute("""
+                INSERT OR REPLACE INTO device_registrations (device_id, user_id, sf_user_id)
+                VALUES (?, ?, ?)
+            """, (data.deviceId, data.userId, data.sfUserId))
         
         logger.info(f"Registered device {data.deviceId} for user {data.sfUserId}")
         return {"success": True, "message": "Device registered successfully"}
@@ -0,0 +1,41 @@
+# server/app/logging_setup.py
+"""
+Process-wide logging configuration.
+
+Application loggers (services, sync jobs, routers) propagate to the root
+logger, whose only handler enqueues records; a single QueueListener thread
+formats them and writes to stderr. Request threads never take the stream
+lock or block on the write.
+"""
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueListener
+from typing import Optional
+
+from .settings import settings
+from .middleware.log_handlers import DeferredQueueHandler
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Route root logging through a queue drained by one writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
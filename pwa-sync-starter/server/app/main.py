@@ -2,9 +2,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import threading
+from .logging_setup import setup_logging
 from .routers import baseline
 from .settings import settings
-from .models.db import engine, Base
+from .models.db import engine, Base, get_db as get_device_db
 from .jobs.scheduler import start_scheduler
 from .sync_runner import run_initial_sync_if_needed
 from .api.sync import sf_router
@@ -24,7 +25,10 @@ from .api.photos import router as photos_router
 from .api.signing_requests import router as signing_requests_router
 from .api.pending_signatures import router as pending_signatures_router
 from .middleware.logging_with_audit import setup_audit_logging
+from .salesforce.audit_log_service import audit_logger
+from .salesforce.sf_client import close_async_client
 
+setup_logging()
 init_schema_and_seed()
 
 app = FastAPI(title="TGTHR Sync API", version="0.1.0")
@@ -94,5 +98,12 @@ def healthcheck():
 # Start background jobs once per process (avoids double-start with --reload)
 @app.on_event("startup")
 def _startup():
+    get_device_db()  # open the shared device-registration connection up front
+    audit_logger.start()
     start_scheduler()
     threading.Thread(target=run_initial_sync_if_needed, name="initial-sync", daemon=True).start()
+
+@app.on_event("shutdown")
+async def _shutdown():
+    audit_logger.stop()
+    await close_async_client()
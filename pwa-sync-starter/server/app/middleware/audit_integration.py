@@ -11,13 +11,27 @@ This module bridges:
 Guarantees one authoritative audit trail in Salesforce for all PHI access.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 from fastapi import Request
 
+from .endpoints import EndpointClassifier, RouteClass
+
 logger = logging.getLogger("audit_integration")
 
+# Bound on queued Salesforce audit events; new events are dropped (and counted) when full
+AUDIT_QUEUE_MAXSIZE = 10000
+
+# Maximum events per Composite audit post (Salesforce allows up to 200)
+AUDIT_BATCH_SIZE = 100
+
+# Seconds to wait for more events before posting a partial batch
+AUDIT_BATCH_MAX_WAIT = 0.2
+
 
 # Endpoints that access PHI (Personally Identifiable/Health Information)
 PHI_ACCESS_PATTERNS = {
@@ -38,6 +52,32 @@ PHI_ACCESS_PATTERNS = {
     '/api/disburse': 'DISBURSE_BENEFIT',
 }
 
+# HTTP method -> suffix appended to the PHI pattern action (GET/HEAD/OPTIONS use the bare action)
+_METHOD_SUFFIXES = {
+    "POST": "_CREATE",
+    "PUT": "_MODIFY",
+    "PATCH": "_MODIFY",
+    "DELETE": "_DELETE",
+}
+
+# {bare action: {method: final action}} precomputed so no strings are built per request
+_ACTIONS_BY_METHOD = {
+    action: {method: action + suffix for method, suffix in _METHOD_SUFFIXES.items()}
+    for action in PHI_ACCESS_PATTERNS.values()
+}
+
+# Fallback action by HTTP method when no PHI pattern matches
+_METHOD_ACTIONS = {
+    "GET": "VIEW",
+    "POST": "CREATE",
+    "PUT": "MODIFY",
+    "PATCH": "MODIFY",
+    "DELETE": "DELETE",
+}
+
+# Event type indexed by HTTP status code: < 400 is a successful access, everything else an attempt
+_EVENT_TYPE_BY_STATUS = tuple("ACCESS" if code < 400 else "ATTEMPT" for code in range(600))
+
 # Non-PHI endpoints (don't log to audit trail)
 NON_PHI_ENDPOINTS = {
     '/health',
@@ -47,6 +87,27 @@ NON_PHI_ENDPOINTS = {
     '/redoc',
 }
 
+# PHI/non-PHI prefixes in one trie; the logging middleware shares its RouteClass via request.state
+PHI_CLASSIFIER = EndpointClassifier(phi_actions=PHI_ACCESS_PATTERNS, non_phi=NON_PHI_ENDPOINTS)
+
+
+@dataclass(slots=True)
+class AuditRecord:
+    """
+    Extended context stored in Audit_Log__c.Audit_JSON__c for one API access.
+    Serialized directly by orjson (no intermediate dict).
+    """
+    request_id: Optional[str]
+    method: str
+    path: str
+    query_params: Optional[Dict[str, str]]
+    status_code: int
+    duration_ms: float
+    entity_count: int
+    entities_accessed: List[str]
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
 
 class AuditIntegration:
     """
@@ -61,12 +122,103 @@ class AuditIntegration:
             entity_ids=[person_id, case_id],
             duration_ms=156.2
         )
+    
+    Inside the running app, prefer submit_api_access(), which queues the event
+    for a background worker instead of posting to Salesforce on the event loop.
     """
     
     def __init__(self):
         """Initialize with Salesforce audit logger"""
         from ..salesforce.audit_log_service import audit_logger
         self.audit_logger = audit_logger
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.dropped_events = 0
+    
+    async def start(self) -> None:
+        """Create the event queue and start the background worker (call on app startup)."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAXSIZE)
+        self._worker = asyncio.create_task(self._run_worker(self._queue), name="audit-worker")
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush queued events (up to ``timeout`` seconds) and stop the worker."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Audit queue not drained on shutdown: {self._queue.qsize()} events lost")
+        self._worker.cancel()
+        self._worker = None
+        self._queue = None
+    
+    def submit_api_access(self, **kwargs: Any) -> None:
+        """
+        Queue an API access event for the background worker.
+        Takes the same arguments as log_api_access(). Never blocks: when the
+        queue is full the event is dropped and counted. Falls back to logging
+        inline if the worker has not been started.
+        """
+        if self._queue is None:
+            self.log_api_access(**kwargs)
+            return
+        kwargs.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+        try:
+            self._queue.put_nowait(kwargs)
+        except asyncio.QueueFull:
+            self.dropped_events += 1
+            logger.error(f"Audit queue full; dropped event ({self.dropped_events} total)")
+    
+    async def _run_worker(self, queue: asyncio.Queue) -> None:
+        """
+        Collect queued events into batches and post each batch from a worker thread.
+        A batch is sent when it reaches AUDIT_BATCH_SIZE or AUDIT_BATCH_MAX_WAIT
+        seconds after its first event, whichever comes first.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + AUDIT_BATCH_MAX_WAIT
+            while len(batch) < AUDIT_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self._log_batch, batch)
+            except Exception as e:
+                logger.error(f"Audit worker failed to post {len(batch)} events: {str(e)}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    def _log_batch(self, batch: list[Dict[str, Any]]) -> None:
+        """Build Audit_Log__c records for queued events and create them in one Composite call."""
+        records = []
+        for event in batch:
+            request = event["request"]
+            route = self._classify(request)
+            if not route.is_phi:
+                continue
+            try:
+                action = self._build_log_action(route=route, **event)
+                records.append(self.audit_logger.build_record(**action))
+            except Exception as e:
+                logger.error(
+                    f"Failed to build audit log for {request.url.path}: {str(e)}",
+                    exc_info=True
+                )
+        self.audit_logger.log_records(records)
     
     def log_api_access(
         self,
@@ -77,6 +229,7 @@ class AuditIntegration:
         duration_ms: float = 0.0,
         request_id: Optional[str] = None,
         error_detail: Optional[str] = None,
+        timestamp: Optional[str] = None,
     ) -> None:
         """
         Log API access to Salesforce audit trail.
@@ -89,6 +242,7 @@ class AuditIntegration:
             duration_ms: Request duration in milliseconds
             request_id: Unique request correlation ID
             error_detail: Error message if request failed
+            timestamp: ISO-8601 access time (defaults to now)
         
         Example:
             audit.log_api_access(
@@ -97,63 +251,32 @@ class AuditIntegration:
                 user_id="user@example.com",
                 entity_ids=["001D000000IRFmaIAH"],  # Salesforce account ID
                 duration_ms=145.2,
-                request_id="550e8400-e29b-41d4-a716-446655440000"
+                request_id="9f1c2e4b7a6d4e0f8b3a5c7d9e1f2a4b"
             )
         """
         # Check if endpoint accesses PHI
-        if not self._is_phi_endpoint(request.url.path):
+        route = self._classify(request)
+        if not route.is_phi:
             return  # Don't log non-PHI endpoints
         
         try:
-            # Determine action type
-            action_type = self._get_action_type(request)
-            event_type = self._get_event_type(response_status)
-            
-            # Determine which entity was accessed
-            primary_entity_id = entity_ids[0] if entity_ids else None
-            
-            # Build audit details
-            details = self._build_audit_details(
+            action = self._build_log_action(
                 request=request,
+                route=route,
                 response_status=response_status,
+                user_id=user_id,
+                entity_ids=entity_ids,
                 duration_ms=duration_ms,
-                entity_count=len(entity_ids) if entity_ids else 0,
+                request_id=request_id,
+                error_detail=error_detail,
+                timestamp=timestamp,
             )
             
-            # Build audit JSON for extended context
-            audit_json = {
-                "request_id": request_id,
-                "method": request.method,
-                "path": str(request.url.path),
-                "query_params": dict(request.query_params) if request.query_params else None,
-                "status_code": response_status,
-                "duration_ms": round(duration_ms, 2),
-                "entity_count": len(entity_ids) if entity_ids else 0,
-                "entities_accessed": entity_ids if entity_ids else [],
-            }
-            
-            # Add error details if present
-            if error_detail:
-                audit_json["error"] = error_detail
-                audit_json["error_type"] = "FAILED_ACCESS_ATTEMPT"
-            
             # Log to Salesforce
-            self.audit_logger.log_action(
-                action_type=action_type,
-                entity_id=primary_entity_id,
-                details=details,
-                user_id=user_id,
-                application="PWA",
-                audit_json=audit_json,
-                event_type=event_type,
-                source_ip=self._get_client_ip(request),
-                status="SUCCESS" if response_status < 400 else "FAILURE",
-                timestamp=datetime.now(timezone.utc).isoformat(),
-                compliance_reference=request_id,
-            )
+            self.audit_logger.log_action(**action)
             
             logger.debug(
-                f"Audit log created: {action_type} on {primary_entity_id} "
+                f"Audit log created: {action['action_type']} on {action['entity_id']} "
                 f"by {user_id} (status: {response_status})"
             )
             
@@ -163,57 +286,107 @@ class AuditIntegration:
                 exc_info=True
             )
     
+    def _build_log_action(
+        self,
+        *,
+        request: Request,
+        route: RouteClass,
+        response_status: int,
+        user_id: Optional[str] = None,
+        entity_ids: Optional[list[str]] = None,
+        duration_ms: float = 0.0,
+        request_id: Optional[str] = None,
+        error_detail: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the AuditLogService.log_action() arguments for one API access."""
+        # Read path/query straight from the ASGI scope (request.url would
+        # rebuild the full URL just to take these back apart)
+        method = request.method
+        path = request.scope["path"]
+        query_string = request.scope["query_string"]
+        
+        # Determine action type
+        action_type = self._get_action_type(request, route)
+        event_type = self._get_event_type(response_status)
+        
+        # Determine which entity was accessed
+        primary_entity_id = entity_ids[0] if entity_ids else None
+        entity_count = len(entity_ids) if entity_ids else 0
+        
+        # Build audit details
+        details = self._build_audit_details(
+            method=method,
+            path=path,
+            response_status=response_status,
+            duration_ms=duration_ms,
+            entity_count=entity_count,
+        )
+        
+        # Build audit JSON for extended context
+        audit_json = AuditRecord(
+            request_id=request_id,
+            method=method,
+            path=path,
+            query_params=dict(request.query_params) if query_string else None,
+            status_code=response_status,
+            duration_ms=round(duration_ms, 2),
+            entity_count=entity_count,
+            entities_accessed=entity_ids if entity_ids else [],
+        )
+        
+        # Add error details if present
+        if error_detail:
+            audit_json.error = error_detail
+            audit_json.error_type = "FAILED_ACCESS_ATTEMPT"
+        
+        return {
+            "action_type": action_type,
+            "entity_id": primary_entity_id,
+            "details": details,
+            "user_id": user_id,
+            "application": "PWA",
+            "audit_json": audit_json,
+            "event_type": event_type,
+            "source_ip": self._get_client_ip(request),
+            "status": "SUCCESS" if response_status < 400 else "FAILURE",
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "compliance_reference": request_id,
+        }
+    
+    def _classify(self, request: Request) -> RouteClass:
+        """Reuse the middleware's RouteClass for this request, or classify the path now."""
+        route = getattr(request.state, 'route_class', None)
+        if route is None:
+            route = PHI_CLASSIFIER.classify(request.scope["path"])
+        return route
+    
     def _is_phi_endpoint(self, path: str) -> bool:
         """
         Check if this endpoint accesses PHI (Personally Identifiable/Health Information).
         
         Returns True if path matches any PHI patterns, False for non-PHI endpoints.
         """
-        # Skip non-PHI endpoints
-        if any(path.startswith(excluded) for excluded in NON_PHI_ENDPOINTS):
-            return False
-        
-        # Check if path matches PHI patterns
-        return any(path.startswith(pattern) for pattern in PHI_ACCESS_PATTERNS.keys())
+        return PHI_CLASSIFIER.classify(path).is_phi
     
-    def _get_action_type(self, request: Request) -> str:
+    def _get_action_type(self, request: Request, route: Optional[RouteClass] = None) -> str:
         """Determine audit action type from HTTP method and path."""
         method = request.method.upper()
-        path = request.url.path
-        
-        # Check for specific endpoint patterns
-        for pattern, action in PHI_ACCESS_PATTERNS.items():
-            if path.startswith(pattern):
-                # Combine pattern action with HTTP method
-                if method == "POST":
-                    return f"{action}_CREATE"
-                elif method == "PUT" or method == "PATCH":
-                    return f"{action}_MODIFY"
-                elif method == "DELETE":
-                    return f"{action}_DELETE"
-                else:  # GET, HEAD, OPTIONS
-                    return action
+        if route is None:
+            route = self._classify(request)
+        
+        # Combine the matched PHI pattern action with the HTTP method
+        if route.action is not None:
+            return _ACTIONS_BY_METHOD[route.action].get(method, route.action)
         
         # Fallback based on method
-        method_actions = {
-            "GET": "VIEW",
-            "POST": "CREATE",
-            "PUT": "MODIFY",
-            "PATCH": "MODIFY",
-            "DELETE": "DELETE",
-        }
-        return method_actions.get(method, "OTHER")
+        return _METHOD_ACTIONS.get(method, "OTHER")
     
     def _get_event_type(self, status_code: int) -> str:
         """Determine event type based on HTTP status code."""
-        if status_code < 300:
-            return "ACCESS"  # Success
-        elif status_code < 400:
-            return "ACCESS"  # Still successful (redirect, etc)
-        elif status_code == 401 or status_code == 403:
-            return "ATTEMPT"  # Failed auth/permission
-        else:
-            return "ATTEMPT"  # Other failures
+        if 0 <= status_code < 600:
+            return _EVENT_TYPE_BY_STATUS[status_code]
+        return "ATTEMPT"
     
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP from request, checking X-Forwarded-For."""
@@ -229,7 +402,8 @@ class AuditIntegration:
     
     def _build_audit_details(
         self,
-        request: Request,
+        method: str,
+        path: str,
         response_status: int,
         duration_ms: float,
         entity_count: int,
@@ -238,7 +412,7 @@ class AuditIntegration:
         status_text = "SUCCESS" if response_status < 400 else "FAILURE"
         
         details = (
-            f"{request.method} {request.url.path} - {status_text} ({response_status})"
+            f"{method} {path} - {status_text} ({response_status})"
         )
         
         if entity_count > 0:
@@ -249,5 +423,11 @@ class AuditIntegration:
         return details
 
 
-# Global instance for easy access
-audit_integration = AuditIntegration()
+@functools.cache
+def get_audit_integration() -> AuditIntegration:
+    """
+    Return this process's AuditIntegration, created on first use.
+    Building it lazily (after Uvicorn forks workers) keeps the Salesforce
+    client and its connections owned by the worker that uses them.
+    """
+    return AuditIntegration()
@@ -0,0 +1,97 @@
+"""
+server/app/middleware/endpoints.py
+
+Single-pass classification of request paths for the logging/audit middleware.
+All endpoint prefix sets are loaded into one character trie so a request path
+is walked once instead of being scanned against each set separately.
+"""
+
+import functools
+from typing import Dict, Iterable, NamedTuple, Optional
+
+_SKIP = 1
+_SENSITIVE = 2
+_PHI = 4
+_NON_PHI = 8
+
+# Distinct paths whose classification is memoized per classifier
+CLASSIFY_CACHE_SIZE = 2048
+
+
+class RouteClass(NamedTuple):
+    """Classification of a request path."""
+    skip: bool              # Excluded from request logging
+    is_sensitive: bool      # Query params must not be logged
+    is_phi: bool            # Accesses PHI and goes to the Salesforce audit trail
+    action: Optional[str]   # PHI action for the matched prefix (None if not PHI)
+
+
+class _Node:
+    __slots__ = ("children", "flags", "action")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.flags = 0
+        self.action: Optional[str] = None
+
+
+class EndpointClassifier:
+    """
+    Prefix trie over the excluded, sensitive, PHI and non-PHI endpoint sets.
+
+    A path belongs to a set when it starts with one of the set's prefixes.
+    When several PHI prefixes match, the shortest one supplies the action.
+    Results are memoized (LRU) so repeated paths skip the walk entirely.
+    """
+
+    def __init__(
+        self,
+        *,
+        excluded: Iterable[str] = (),
+        sensitive: Iterable[str] = (),
+        phi_actions: Optional[Dict[str, str]] = None,
+        non_phi: Iterable[str] = (),
+    ):
+        self._root = _Node()
+        for prefix in excluded:
+            self._add(prefix, _SKIP)
+        for prefix in sensitive:
+            self._add(prefix, _SENSITIVE)
+        for prefix in non_phi:
+            self._add(prefix, _NON_PHI)
+        for prefix, action in (phi_actions or {}).items():
+            self._add(prefix, _PHI, action)
+        self.classify = functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._walk)
+
+    def _add(self, prefix: str, flag: int, action: Optional[str] = None) -> None:
+        node = self._root
+        for ch in prefix:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+        node.flags |= flag
+        if action is not None and node.action is None:
+            node.action = action
+
+    def _walk(self, path: str) -> RouteClass:
+        """Walk the trie once along ``path`` and collect every matching prefix."""
+        flags = 0
+        action = None
+        node = self._root
+        for ch in path:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.flags:
+                flags |= node.flags
+                if action is None:
+                    action = node.action
+
+        is_phi = bool(flags & _PHI) and not flags & _NON_PHI
+        return RouteClass(
+            skip=bool(flags & _SKIP),
+            is_sensitive=bool(flags & _SENSITIVE),
+            is_phi=is_phi,
+            action=action if is_phi else None,
+        )
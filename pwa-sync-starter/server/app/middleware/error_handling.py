@@ -5,7 +5,10 @@ Centralized error handling and security exception classes.
 Prevents leaking sensitive information in error responses.
 """
 
+import asyncio
 import logging
+import os
+import re
 import traceback
 from typing import Any, Dict, Optional
 from fastapi import Request, status
@@ -14,6 +17,9 @@ from pydantic import ValidationError
 
 logger = logging.getLogger("error_handling")
 
+# Strong references to pending traceback log tasks (the event loop only keeps weak ones)
+_traceback_tasks: set = set()
+
 
 class SecurityException(Exception):
     """
@@ -123,13 +129,11 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
     Never expose internal details, stack traces, or sensitive info.
     """
     # Generate unique error ID for correlation
-    import uuid
-    error_id = str(uuid.uuid4())
+    error_id = os.urandom(16).hex()
 
-    # Log full details for debugging
+    # Log a one-line summary now; the traceback is formatted after the response is sent
     logger.error(
-        f"Unhandled exception (Error ID: {error_id})",
-        exc_info=exc,
+        f"Unhandled exception (Error ID: {error_id}): {type(exc).__name__}",
         extra={
             "error_id": error_id,
             "exception_type": type(exc).__name__,
@@ -139,6 +143,10 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
         }
     )
 
+    task = asyncio.create_task(_log_traceback_async(error_id, exc))
+    _traceback_tasks.add(task)
+    task.add_done_callback(_traceback_tasks.discard)
+
     # Return generic error with correlation ID
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -150,8 +158,30 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
     )
 
 
+async def _log_traceback_async(error_id: str, exc: BaseException) -> None:
+    """
+    Format and log the full traceback for an unhandled exception.
+    Formatting runs in a worker thread so large stacks don't stall the event loop.
+    """
+    formatted = await asyncio.to_thread(
+        lambda: "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    )
+    logger.error(f"Traceback for Error ID {error_id}:\n{formatted}")
+
+
 # ==================== UTILITY FUNCTIONS ====================
 
+# Field-name terms redacted by redact_dict_sensitive_fields (substring, case-insensitive)
+_SENSITIVE_FIELDS = frozenset({
+    'password', 'token', 'authorization', 'secret', 'key',
+    'client_secret', 'access_token', 'refresh_token',
+    'credit_card', 'ssn', 'pii', 'pin', 'private_key',
+    'jwt', 'bearer', 'api_key', 'oauth_token'
+})
+_SENSITIVE_FIELD_RE = re.compile(
+    "|".join(re.escape(field) for field in sorted(_SENSITIVE_FIELDS)), re.IGNORECASE
+)
+
 def safe_error_detail(exception: Exception, max_length: int = 200) -> str:
     """
     Extract safe error detail from exception.
@@ -193,16 +223,9 @@ def redact_dict_sensitive_fields(data: dict, depth: int = 0, max_depth: int = 3)
     if depth >= max_depth or not isinstance(data, dict):
         return data
 
-    sensitive_fields = {
-        'password', 'token', 'authorization', 'secret', 'key',
-        'client_secret', 'access_token', 'refresh_token',
-        'credit_card', 'ssn', 'pii', 'pin', 'private_key',
-        'jwt', 'bearer', 'api_key', 'oauth_token'
-    }
-
     redacted = {}
     for key, value in data.items():
-        if any(sensitive in key.lower() for sensitive in sensitive_fields):
+        if _SENSITIVE_FIELD_RE.search(key):
             redacted[key] = "***REDACTED***"
         elif isinstance(value, dict):
             redacted[key] = redact_dict_sensitive_fields(value, depth + 1, max_depth)
@@ -0,0 +1,122 @@
+"""
+server/app/middleware/log_handlers.py
+
+Low-overhead logging handlers for the request/audit loggers.
+"""
+
+import logging
+import os
+import threading
+from logging.handlers import QueueHandler
+
+
+class BytesFormatter(logging.Formatter):
+    """
+    Renders records directly to bytes for BufferedLineHandler.
+
+    ``prefix`` is a %-style format applied to the record (e.g.
+    "%(request_id)s "). Messages logged as pre-serialized bytes are appended
+    after the prefix as-is, skipping the str round-trip and re-encode.
+    """
+
+    def __init__(self, prefix: str = ""):
+        super().__init__("%(message)s")
+        self._prefix = prefix
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        prefix = (self._prefix % record.__dict__).encode("utf-8") if self._prefix else b""
+        msg = record.msg
+        if isinstance(msg, bytes) and not record.args and not record.exc_info:
+            return prefix + msg
+        return prefix + self.format(record).encode("utf-8")
+
+
+class BufferedLineHandler(logging.Handler):
+    """
+    Buffers formatted log lines in memory and writes them to a file descriptor
+    in a single os.write() when the buffer fills or on a short timer.
+
+    Files opened via BufferedLineHandler.open() use O_APPEND, so appends are
+    atomic and several workers can share the same log file without locking.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        buffer_size: int = 65536,
+        flush_interval: float = 0.1,
+        owns_fd: bool = False,
+    ):
+        super().__init__()
+        self._fd = fd
+        self._owns_fd = owns_fd
+        self._buf = bytearray()
+        self._buffer_size = buffer_size
+        self._stop_flusher = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-flush",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "BufferedLineHandler":
+        """Open (or create) an append-only log file and wrap it."""
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        return cls(fd, owns_fd=True, **kwargs)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Handler.handle() already holds self.lock here
+        try:
+            formatter = self.formatter
+            if isinstance(formatter, BytesFormatter):
+                self._buf += formatter.format_bytes(record)
+            else:
+                self._buf += self.format(record).encode("utf-8")
+            self._buf.append(0x0A)
+            if len(self._buf) >= self._buffer_size:
+                self._write()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            self._write()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self._stop_flusher.set()
+        self.flush()
+        if self._owns_fd:
+            os.close(self._fd)
+            self._owns_fd = False
+        super().close()
+
+    def _write(self) -> None:
+        """Write out and clear the buffer. Caller must hold self.lock."""
+        if not self._buf:
+            return
+        data = memoryview(bytes(self._buf))
+        self._buf.clear()
+        while data:
+            data = data[os.write(self._fd, data):]
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop_flusher.wait(interval):
+            self.flush()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted, leaving message
+    formatting to the QueueListener thread. Only suitable for in-process
+    queues; attach filters that read request context (e.g. the request ID)
+    to this handler so they run on the calling thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
@@ -5,20 +5,35 @@ Request/response logging middleware for audit trail.
 Logs all API activity while redacting sensitive information.
 """
 
+import atexit
 import logging
-import uuid
+import os
+import queue
+import re
+import sys
 import time
-import json
+import orjson
+from contextvars import ContextVar
+from logging.handlers import QueueListener
 from fastapi import Request
-from typing import Callable, Optional, Dict, Any
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Dict, Any
 from datetime import datetime
 
+from ..settings import settings
+from .endpoints import EndpointClassifier, RouteClass
+from .log_handlers import BufferedLineHandler, BytesFormatter, DeferredQueueHandler
+
 logger = logging.getLogger("audit")
 perf_logger = logging.getLogger("performance")
 
+# Correlation ID of the request currently being handled ("-" outside a request)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
 
 # Sensitive fields that should never appear in logs
-REDACTED_FIELDS = {
+REDACTED_FIELDS = frozenset({
     # Authentication
     'password', 'token', 'authorization', 'secret', 'key',
     'client_secret', 'access_token', 'refresh_token',
@@ -29,7 +44,12 @@ REDACTED_FIELDS = {
     'private_key', 'rsa_key', 'dsa_key',
     # Salesforce
     'sf_user_id', 'instance_url', 'consumer_key', 'consumer_secret',
-}
+})
+
+# Matches any REDACTED_FIELDS term anywhere in a field name (case-insensitive)
+_REDACT_RE = re.compile(
+    "|".join(re.escape(field) for field in sorted(REDACTED_FIELDS)), re.IGNORECASE
+)
 
 # Endpoints that should not be logged in detail (too verbose)
 EXCLUDED_ENDPOINTS = {
@@ -46,6 +66,45 @@ SENSITIVE_ENDPOINTS = {
     '/api/device',
 }
 
+# Exact excluded paths, checked before the classifier
+_EXCLUDED_EXACT = frozenset(EXCLUDED_ENDPOINTS)
+
+# Excluded/sensitive prefixes classified in a single trie walk per request
+ENDPOINT_CLASSIFIER = EndpointClassifier(
+    excluded=EXCLUDED_ENDPOINTS,
+    sensitive=SENSITIVE_ENDPOINTS,
+)
+
+
+# Pre-rendered JSON log line templates (request ID is added by the formatter).
+# Method and client IP come from the ASGI server; path, user agent and query
+# params are JSON-encoded before substitution.
+_REQUEST_LOG = (
+    '{"type": "HTTP_REQUEST", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"client_ip": "%s", "user_agent": %s}'
+)
+_REQUEST_WITH_QUERY_LOG = (
+    '{"type": "HTTP_REQUEST", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"client_ip": "%s", "user_agent": %s, "query_params": %s}'
+)
+_ERROR_LOG = (
+    '{"type": "HTTP_ERROR", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"exception": "%s", "client_ip": "%s"}'
+)
+_RESPONSE_LOG = (
+    '{"type": "HTTP_RESPONSE", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"status_code": %d, "duration_ms": %.2f}'
+)
+# Requests slower than this are also reported on the performance logger
+SLOW_REQUEST_NS = 1_000_000_000
+
+_SLOW_REQUEST_LOG = '{"message": "Slow request", "path": %s, "duration_ms": %.2f}'
+
+
+def _json(value) -> str:
+    """JSON-encode a value for substitution into a log line template."""
+    return orjson.dumps(value).decode()
+
 
 def redact_value(value: str, field_name: str) -> str:
     """
@@ -58,7 +117,7 @@ def redact_value(value: str, field_name: str) -> str:
     Returns:
         Original or redacted value
     """
-    if any(sensitive in field_name.lower() for sensitive in REDACTED_FIELDS):
+    if _REDACT_RE.search(field_name):
         if isinstance(value, str) and len(value) > 10:
             # Show first and last few chars for context
             return f"{value[:4]}...{value[-4:]}"
@@ -84,7 +143,7 @@ def redact_dict_recursive(data: Any, depth: int = 0, max_depth: int = 3) -> Any:
     if isinstance(data, dict):
         redacted = {}
         for key, value in data.items():
-            if any(sensitive in key.lower() for sensitive in REDACTED_FIELDS):
+            if _REDACT_RE.search(key):
                 redacted[key] = "***REDACTED***"
             elif isinstance(value, (dict, list)):
                 redacted[key] = redact_dict_recursive(value, depth + 1, max_depth)
@@ -99,141 +158,200 @@ def redact_dict_recursive(data: Any, depth: int = 0, max_depth: int = 3) -> Any:
         return data
 
 
+# Maximum number of request body bytes retained for logging
+MAX_BODY_LOG_BYTES = 4096
+
+
 def extract_request_body(request: Request, max_size: int = 1000) -> Optional[str]:
     """
-    Safely extract request body for logging without fully consuming it.
-    Note: Request body can only be read once in FastAPI, so this should be used carefully.
-    Consider storing body in request.state if needed by other middleware.
+    Return the start of the request body for logging.
+    Reads the preview captured by BodyPreviewMiddleware, so the body itself
+    is never buffered or consumed here.
     """
-    try:
-        # Check if body was pre-cached in request state
-        if hasattr(request.state, 'body'):
-            body = request.state.body
-            if isinstance(body, bytes):
-                body_str = body.decode('utf-8', errors='replace')
-            else:
-                body_str = str(body)
-            
-            if len(body_str) > max_size:
-                body_str = body_str[:max_size] + "..."
-            
-            return body_str
-    except Exception:
-        pass
+    preview = getattr(request.state, 'body_preview', None)
+    if not preview:
+        return None
+    
+    body_str = bytes(preview[:max_size]).decode('utf-8', errors='replace')
+    if len(preview) > max_size:
+        body_str += "..."
     
-    return None
+    return body_str
 
 
-class RequestIDMiddleware:
+class BodyPreviewMiddleware:
     """
-    Adds a unique request ID to each request for correlation.
-    Should be registered as the first middleware.
+    Pure ASGI middleware that copies the first MAX_BODY_LOG_BYTES of the
+    request body into request.state.body_preview while passing every
+    chunk through to the handler unchanged.
     """
     
     def __init__(self, app):
         self.app = app
     
-    async def __call__(self, request: Request, call_next: Callable):
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        preview = bytearray()
+        scope.setdefault("state", {})["body_preview"] = preview
         
-        # Add to response headers
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
+        async def receive_with_preview():
+            message = await receive()
+            if message["type"] == "http.request":
+                room = MAX_BODY_LOG_BYTES - len(preview)
+                if room > 0:
+                    preview.extend(memoryview(message.get("body", b""))[:room])
+            return message
         
-        return response
+        await self.app(scope, receive_with_preview, send)
+
+
+class RequestIDFilter(logging.Filter):
+    """Stamp every log record with the current request ID."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
 
 
 class AuditLoggingMiddleware:
     """
-    Logs all API requests and responses for audit trail.
+    Pure ASGI middleware that assigns each request a correlation ID and logs
+    all API requests and responses for audit trail.
     Automatically redacts sensitive information.
     """
     
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         self.app = app
     
-    async def __call__(self, request: Request, call_next: Callable):
-        # Skip logging for excluded endpoints
-        if any(request.url.path.startswith(excluded) for excluded in EXCLUDED_ENDPOINTS):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Skip logging for excluded endpoints; exact hits (health probes)
+        # are a set lookup, anything else is classified by prefix
+        path = scope["path"]
+        if path in _EXCLUDED_EXACT:
+            await self._passthrough(scope, receive, send)
+            return
+        route = ENDPOINT_CLASSIFIER.classify(path)
+        if route.skip:
+            await self._passthrough(scope, receive, send)
+            return
+        
+        # Generate unique request ID (32 hex chars, one urandom read)
+        request_id = os.urandom(16).hex()
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        token = request_id_var.set(request_id)
+        try:
+            await self._handle(scope, receive, send, path, route, request_id)
+        finally:
+            request_id_var.reset(token)
+    
+    async def _passthrough(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve an unlogged request; it still gets a request ID and X-Request-ID header."""
+        request_id = os.urandom(16).hex()
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
         
-        # Get or generate request ID
-        request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
-        start_time = time.time()
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+    
+    async def _handle(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        path: str,
+        route: RouteClass,
+        request_id: str,
+    ) -> None:
+        start_ns = time.perf_counter_ns()
         
-        # Extract request info
-        method = request.method
-        path = request.url.path
-        query_params = dict(request.query_params) if request.query_params else {}
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
+        # Extract request info straight from the ASGI scope
+        method = scope["method"]
+        query_string = scope["query_string"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
         
         # Check if sensitive endpoint
-        is_sensitive = any(path.startswith(sensitive) for sensitive in SENSITIVE_ENDPOINTS)
+        is_sensitive = route.is_sensitive
         
-        # Log request
-        log_data = {
-            "request_id": request_id,
-            "type": "HTTP_REQUEST",
-            "timestamp": datetime.utcnow().isoformat(),
-            "method": method,
-            "path": path,
-            "client_ip": client_ip,
-            "user_agent": user_agent[:100],  # Truncate UA string
-        }
+        # Request/response lines are INFO; skip building them when it's disabled
+        log_info = logger.isEnabledFor(logging.INFO)
+        timestamp = path_json = None
         
-        if query_params and not is_sensitive:
-            log_data["query_params"] = redact_dict_recursive(query_params)
+        if log_info:
+            # One timestamp per request, shared by all of its log lines
+            timestamp = datetime.utcnow().isoformat()
+            path_json = _json(path)
+            user_agent = Headers(scope=scope).get("user-agent") or "unknown"
+            if len(user_agent) > 100:
+                user_agent = user_agent[:100]  # Truncate UA string
+            
+            # Log request
+            if query_string and not is_sensitive:
+                # Only parse the query string when it will actually be logged
+                logger.info(
+                    _REQUEST_WITH_QUERY_LOG,
+                    timestamp, method, path_json, client_ip,
+                    _json(user_agent),
+                    _json(redact_dict_recursive(dict(QueryParams(query_string)))),
+                )
+            else:
+                logger.info(
+                    _REQUEST_LOG,
+                    timestamp, method, path_json, client_ip,
+                    _json(user_agent),
+                )
+        
+        # Capture the status code and add X-Request-ID as the response starts
+        status_code = 500
         
-        logger.info(json.dumps(log_data))
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
         
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_request_id)
         except Exception as exc:
             # Log exception but don't expose details
             logger.error(
-                json.dumps({
-                    "request_id": request_id,
-                    "type": "HTTP_ERROR",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "method": method,
-                    "path": path,
-                    "exception": type(exc).__name__,
-                    "client_ip": client_ip,
-                })
+                _ERROR_LOG,
+                timestamp or datetime.utcnow().isoformat(), method, path_json or _json(path),
+                type(exc).__name__, client_ip,
             )
             raise
         
         # Log response
-        duration_ms = (time.time() - start_time) * 1000
-        
-        log_data = {
-            "request_id": request_id,
-            "type": "HTTP_RESPONSE",
-            "timestamp": datetime.utcnow().isoformat(),
-            "method": method,
-            "path": path,
-            "status_code": response.status_code,
-            "duration_ms": round(duration_ms, 2),
-        }
-        
-        logger.info(json.dumps(log_data))
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        duration_ms = elapsed_ns / 1_000_000
         
-        # Log performance for slow requests
-        if duration_ms > 1000:
-            perf_logger.warning(
-                json.dumps({
-                    "request_id": request_id,
-                    "message": "Slow request",
-                    "path": path,
-                    "duration_ms": round(duration_ms, 2),
-                })
+        if log_info:
+            logger.info(
+                _RESPONSE_LOG,
+                timestamp, method, path_json,
+                status_code, duration_ms,
             )
         
-        return response
+        # Log performance for slow requests
+        if elapsed_ns > SLOW_REQUEST_NS:
+            perf_logger.warning(_SLOW_REQUEST_LOG, path_json or _json(path), duration_ms)
 
 
 def setup_audit_logging(app):
@@ -251,14 +369,26 @@ def setup_audit_logging(app):
         setup_audit_logging(app)
     """
     # Add middleware (in reverse order - first added runs last)
+    app.add_middleware(BodyPreviewMiddleware)
     app.add_middleware(AuditLoggingMiddleware)
-    app.add_middleware(RequestIDMiddleware)
     
-    # Configure logging
-    audit_handler = logging.StreamHandler()
-    audit_handler.setFormatter(logging.Formatter('%(message)s'))
-    logger.addHandler(audit_handler)
+    # Configure logging: records are stamped with the request ID on the calling
+    # thread, then formatted and written by a QueueListener thread
+    if settings.AUDIT_LOG_PATH:
+        audit_handler = BufferedLineHandler.open(settings.AUDIT_LOG_PATH)
+    else:
+        audit_handler = BufferedLineHandler(sys.stderr.fileno())
+    audit_handler.setFormatter(BytesFormatter('%(request_id)s '))
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIDFilter())
+    listener = QueueListener(log_queue, audit_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logger.addHandler(queue_handler)
     logger.setLevel(logging.INFO)
     
-    perf_logger.addHandler(audit_handler)
+    perf_logger.addHandler(queue_handler)
     perf_logger.setLevel(logging.WARNING)
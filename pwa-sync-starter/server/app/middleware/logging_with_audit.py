@@ -12,27 +12,48 @@ This middleware:
 Result: Single source of truth in Salesforce for all audit events.
 """
 
+import atexit
 import logging
-import uuid
+import os
+import queue
+import re
+import sys
 import time
-import json
+import orjson
+from contextvars import ContextVar
+from logging.handlers import QueueListener
 from fastapi import Request
-from typing import Callable, Optional
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
 from datetime import datetime
 
+from ..settings import settings
+from .audit_integration import NON_PHI_ENDPOINTS, PHI_ACCESS_PATTERNS
+from .endpoints import EndpointClassifier, RouteClass
+from .log_handlers import BufferedLineHandler, BytesFormatter, DeferredQueueHandler
+
 logger = logging.getLogger("audit")
 perf_logger = logging.getLogger("performance")
 
+# Correlation ID of the request currently being handled ("-" outside a request)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
 
 # Sensitive fields that should never appear in logs
-REDACTED_FIELDS = {
+REDACTED_FIELDS = frozenset({
     'password', 'token', 'authorization', 'secret', 'key',
     'client_secret', 'access_token', 'refresh_token',
     'bearer', 'api_key', 'oauth_token', 'jwt',
     'ssn', 'credit_card', 'pin', 'cvv', 'tax_id',
     'private_key', 'rsa_key', 'dsa_key',
     'sf_user_id', 'instance_url', 'consumer_key', 'consumer_secret',
-}
+})
+
+# Matches any REDACTED_FIELDS term anywhere in a field name (case-insensitive)
+_REDACT_RE = re.compile(
+    "|".join(re.escape(field) for field in sorted(REDACTED_FIELDS)), re.IGNORECASE
+)
 
 # Endpoints that are excluded from logging
 EXCLUDED_ENDPOINTS = {
@@ -52,10 +73,51 @@ SENSITIVE_ENDPOINTS = {
     '/api/cases',
 }
 
+# Exact excluded paths, checked before the classifier
+_EXCLUDED_EXACT = frozenset(EXCLUDED_ENDPOINTS)
+
+# Excluded/sensitive/PHI prefixes classified in a single trie walk per request
+ENDPOINT_CLASSIFIER = EndpointClassifier(
+    excluded=EXCLUDED_ENDPOINTS,
+    sensitive=SENSITIVE_ENDPOINTS,
+    phi_actions=PHI_ACCESS_PATTERNS,
+    non_phi=NON_PHI_ENDPOINTS,
+)
+
+
+# Pre-rendered JSON log line templates (request ID is added by the formatter).
+# Method and client IP come from the ASGI server; path, user agent and query
+# params are JSON-encoded before substitution.
+_REQUEST_LOG = (
+    '{"type": "HTTP_REQUEST", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"client_ip": "%s", "user_agent": %s}'
+)
+_REQUEST_WITH_QUERY_LOG = (
+    '{"type": "HTTP_REQUEST", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"client_ip": "%s", "user_agent": %s, "query_params": %s}'
+)
+_ERROR_LOG = (
+    '{"type": "HTTP_ERROR", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"exception": "%s", "client_ip": "%s"}'
+)
+_RESPONSE_LOG = (
+    '{"type": "HTTP_RESPONSE", "timestamp": "%s", "method": "%s", "path": %s, '
+    '"status_code": %d, "duration_ms": %.2f}'
+)
+# Requests slower than this are also reported on the performance logger
+SLOW_REQUEST_NS = 1_000_000_000
+
+_SLOW_REQUEST_LOG = '{"message": "Slow request", "path": %s, "duration_ms": %.2f}'
+
+
+def _json(value) -> str:
+    """JSON-encode a value for substitution into a log line template."""
+    return orjson.dumps(value).decode()
+
 
 def redact_value(value: str, field_name: str) -> str:
     """Redact a single value if it matches sensitive field names."""
-    if any(sensitive in field_name.lower() for sensitive in REDACTED_FIELDS):
+    if _REDACT_RE.search(field_name):
         if isinstance(value, str) and len(value) > 10:
             return f"{value[:4]}...{value[-4:]}"
         return "***REDACTED***"
@@ -70,7 +132,7 @@ def redact_dict_recursive(data, depth: int = 0, max_depth: int = 3):
     if isinstance(data, dict):
         redacted = {}
         for key, value in data.items():
-            if any(sensitive in key.lower() for sensitive in REDACTED_FIELDS):
+            if _REDACT_RE.search(key):
                 redacted[key] = "***REDACTED***"
             elif isinstance(value, (dict, list)):
                 redacted[key] = redact_dict_recursive(value, depth + 1, max_depth)
@@ -85,142 +147,179 @@ def redact_dict_recursive(data, depth: int = 0, max_depth: int = 3):
         return data
 
 
-class RequestIDMiddleware:
-    """Adds a unique request ID to each request for correlation."""
-    
-    def __init__(self, app):
-        self.app = app
-    
-    async def __call__(self, request: Request, call_next: Callable):
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Add to response headers
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
+class RequestIDFilter(logging.Filter):
+    """Stamp every log record with the current request ID."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
 
 
 class AuditLoggingMiddleware:
     """
-    Logs all API requests/responses.
+    Pure ASGI middleware that assigns each request a correlation ID and logs
+    all API requests/responses.
     
     For PHI-related endpoints, also creates Salesforce Audit_Log__c records.
     This ensures single source of truth in Salesforce for compliance.
     """
     
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp, audit_integration=None):
         self.app = app
-        self.audit_integration = None  # Lazy load
+        if audit_integration is None:
+            # Imported here rather than at module load to avoid circular imports
+            from .audit_integration import get_audit_integration
+            audit_integration = get_audit_integration()
+        self.audit_integration = audit_integration
     
-    def _get_audit_integration(self):
-        """Lazy load audit integration to avoid circular imports"""
-        if self.audit_integration is None:
-            from .audit_integration import audit_integration
-            self.audit_integration = audit_integration
-        return self.audit_integration
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Skip logging for excluded endpoints; exact hits (health probes)
+        # are a set lookup, anything else is classified by prefix
+        path = scope["path"]
+        if path in _EXCLUDED_EXACT:
+            await self._passthrough(scope, receive, send)
+            return
+        route = ENDPOINT_CLASSIFIER.classify(path)
+        if route.skip:
+            await self._passthrough(scope, receive, send)
+            return
+        
+        # Generate unique request ID (32 hex chars, one urandom read)
+        request_id = os.urandom(16).hex()
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["route_class"] = route
+        
+        token = request_id_var.set(request_id)
+        try:
+            await self._handle(scope, receive, send, path, route, request_id)
+        finally:
+            request_id_var.reset(token)
     
-    async def __call__(self, request: Request, call_next: Callable):
-        # Skip logging for excluded endpoints
-        if any(request.url.path.startswith(excluded) for excluded in EXCLUDED_ENDPOINTS):
-            return await call_next(request)
+    async def _passthrough(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve an unlogged request; it still gets a request ID and X-Request-ID header."""
+        request_id = os.urandom(16).hex()
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
         
-        # Get request ID (set by RequestIDMiddleware)
-        request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
-        start_time = time.time()
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+    
+    async def _handle(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        path: str,
+        route: RouteClass,
+        request_id: str,
+    ) -> None:
+        start_ns = time.perf_counter_ns()
         
-        # Extract request info
-        method = request.method
-        path = request.url.path
-        query_params = dict(request.query_params) if request.query_params else {}
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")[:100]
+        # Extract request info straight from the ASGI scope
+        method = scope["method"]
+        query_string = scope["query_string"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
         
         # Check if sensitive endpoint (PHI access)
-        is_sensitive = any(path.startswith(sensitive) for sensitive in SENSITIVE_ENDPOINTS)
+        is_sensitive = route.is_sensitive
         
-        # Log request
-        log_data = {
-            "request_id": request_id,
-            "type": "HTTP_REQUEST",
-            "timestamp": datetime.utcnow().isoformat(),
-            "method": method,
-            "path": path,
-            "client_ip": client_ip,
-            "user_agent": user_agent,
-        }
+        # Request/response lines are INFO; skip building them when it's disabled
+        log_info = logger.isEnabledFor(logging.INFO)
+        timestamp = path_json = None
         
-        if query_params and not is_sensitive:
-            log_data["query_params"] = redact_dict_recursive(query_params)
+        if log_info:
+            # One timestamp per request, shared by all of its log lines
+            timestamp = datetime.utcnow().isoformat()
+            path_json = _json(path)
+            user_agent = Headers(scope=scope).get("user-agent") or "unknown"
+            if len(user_agent) > 100:
+                user_agent = user_agent[:100]
+            
+            # Log request
+            if query_string and not is_sensitive:
+                # Only parse the query string when it will actually be logged
+                logger.info(
+                    _REQUEST_WITH_QUERY_LOG,
+                    timestamp, method, path_json, client_ip,
+                    _json(user_agent),
+                    _json(redact_dict_recursive(dict(QueryParams(query_string)))),
+                )
+            else:
+                logger.info(
+                    _REQUEST_LOG,
+                    timestamp, method, path_json, client_ip,
+                    _json(user_agent),
+                )
+        
+        # Capture the status code and add X-Request-ID as the response starts
+        status_code = 500
         
-        logger.info(json.dumps(log_data))
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
         
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_request_id)
         except Exception as exc:
-            # Log exception
+            # Log exception but don't expose details
             logger.error(
-                json.dumps({
-                    "request_id": request_id,
-                    "type": "HTTP_ERROR",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "method": method,
-                    "path": path,
-                    "exception": type(exc).__name__,
-                    "client_ip": client_ip,
-                })
+                _ERROR_LOG,
+                timestamp or datetime.utcnow().isoformat(), method, path_json or _json(path),
+                type(exc).__name__, client_ip,
             )
             raise
         
         # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        duration_ms = elapsed_ns / 1_000_000
         
         # Log response
-        log_data = {
-            "request_id": request_id,
-            "type": "HTTP_RESPONSE",
-            "timestamp": datetime.utcnow().isoformat(),
-            "method": method,
-            "path": path,
-            "status_code": response.status_code,
-            "duration_ms": round(duration_ms, 2),
-        }
-        
-        logger.info(json.dumps(log_data))
+        if log_info:
+            logger.info(
+                _RESPONSE_LOG,
+                timestamp, method, path_json,
+                status_code, duration_ms,
+            )
         
         # Log performance for slow requests
-        if duration_ms > 1000:
-            perf_logger.warning(
-                json.dumps({
-                    "request_id": request_id,
-                    "message": "Slow request",
-                    "path": path,
-                    "duration_ms": round(duration_ms, 2),
-                })
-            )
+        if elapsed_ns > SLOW_REQUEST_NS:
+            perf_logger.warning(_SLOW_REQUEST_LOG, path_json or _json(path), duration_ms)
         
         # ===== CRITICAL: Log to Salesforce audit trail =====
         # This ensures single source of truth for PHI access
+        if not route.is_phi:
+            return
         try:
-            audit = self._get_audit_integration()
-            audit.log_api_access(
-                request=request,
-                response_status=response.status_code,
-                user_id=getattr(request.state, 'user_id', None),
-                entity_ids=getattr(request.state, 'entity_ids', None),
+            state = scope["state"]
+            self.audit_integration.submit_api_access(
+                request=Request(scope),
+                response_status=status_code,
+                user_id=state.get('user_id'),
+                entity_ids=state.get('entity_ids'),
                 duration_ms=duration_ms,
                 request_id=request_id,
-                error_detail=None if response.status_code < 400 else f"HTTP {response.status_code}",
+                error_detail=None if status_code < 400 else f"HTTP {status_code}",
             )
         except Exception as e:
-            logger.error(f"Failed to log to Salesforce audit trail: {str(e)}", exc_info=True)
+            logger.error("Failed to queue Salesforce audit event: %s", e, exc_info=True)
             # Don't raise - continue processing
-        
-        response.headers["X-Request-ID"] = request_id
-        return response
 
 
 def setup_audit_logging(app):
@@ -242,15 +341,39 @@ def setup_audit_logging(app):
         app = FastAPI()
         setup_audit_logging(app)
     """
-    # Add middleware (in reverse order - first added runs last)
-    app.add_middleware(AuditLoggingMiddleware)
-    app.add_middleware(RequestIDMiddleware)
+    # Salesforce audit events are posted by a background worker per process
+    from .audit_integration import get_audit_integration
+    audit_integration = get_audit_integration()
+    
+    # Add middleware (also assigns request IDs)
+    app.add_middleware(AuditLoggingMiddleware, audit_integration=audit_integration)
+    
+    async def _start_audit_worker():
+        await audit_integration.start()
+    
+    async def _stop_audit_worker():
+        await audit_integration.stop()
+    
+    app.add_event_handler("startup", _start_audit_worker)
+    app.add_event_handler("shutdown", _stop_audit_worker)
+    
+    # Configure logging: records are stamped with the request ID on the calling
+    # thread, then formatted and written by a QueueListener thread
+    if settings.AUDIT_LOG_PATH:
+        audit_handler = BufferedLineHandler.open(settings.AUDIT_LOG_PATH)
+    else:
+        audit_handler = BufferedLineHandler(sys.stderr.fileno())
+    audit_handler.setFormatter(BytesFormatter('%(request_id)s '))
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIDFilter())
+    listener = QueueListener(log_queue, audit_handler)
+    listener.start()
+    atexit.register(listener.stop)
     
-    # Configure logging
-    audit_handler = logging.StreamHandler()
-    audit_handler.setFormatter(logging.Formatter('%(message)s'))
-    logger.addHandler(audit_handler)
+    logger.addHandler(queue_handler)
     logger.setLevel(logging.INFO)
     
-    perf_logger.addHandler(audit_handler)
+    perf_logger.addHandler(queue_handler)
     perf_logger.setLevel(logging.WARNING)
@@ -5,14 +5,31 @@ Input validation models and utilities for API endpoints.
 These models use Pydantic v2 for strict runtime validation.
 """
 
-from pydantic import BaseModel, field_validator, Field, ValidationError, model_validator
+from pydantic import BaseModel, field_validator, Field, TypeAdapter, ValidationError, ValidationInfo, model_validator
 from typing import Optional, Dict, Any, List, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 import re
+import json
 import logging
+import orjson
 
 logger = logging.getLogger("validation")
 
+SYNC_TABLES = frozenset({'notes', 'interactions'})
+SYNC_OPS = frozenset({'insert', 'update', 'delete'})
+MAX_PAYLOAD_BYTES = 100_000  # 100 KB limit per mutation
+
+# Extended-format ISO 8601 date prefix (YYYY-MM-DD). Checked before parsing so
+# malformed values are rejected cheaply and the compact forms that
+# datetime.fromisoformat() accepts since Python 3.11 are still refused.
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# str.translate table deleting ASCII alphanumerics and allowed punctuation, so
+# whatever is left of a note body is (ASCII) special characters or non-ASCII
+_DELETE_PLAIN_ASCII = dict.fromkeys(
+    (c for c in range(128) if chr(c).isalnum() or chr(c) in ' \n\t.,:;!?-'), None
+)
+
 
 # ==================== MUTATION VALIDATION ====================
 
@@ -31,14 +48,14 @@ class SyncMutationValidated(BaseModel):
     @field_validator('table')
     @classmethod
     def validate_table(cls, v):
-        if v not in ('notes', 'interactions'):
+        if v not in SYNC_TABLES:
             raise ValueError('table must be "notes" or "interactions"')
         return v
     
     @field_validator('op')
     @classmethod
     def validate_op(cls, v):
-        if v not in ('insert', 'update', 'delete'):
+        if v not in SYNC_OPS:
             raise ValueError('op must be "insert", "update", or "delete"')
         return v
 
@@ -48,18 +65,26 @@ class SyncMutationValidated(BaseModel):
         """Validate ISO 8601 timestamp format"""
         try:
             # Accept both formats: 2025-01-01T00:00:00Z and 2025-01-01T00:00:00+00:00
-            datetime.fromisoformat(v.replace('Z', '+00:00'))
+            if not _ISO_DATE_RE.match(v):
+                raise ValueError
+            datetime.fromisoformat(v)
             return v
-        except (ValueError, AttributeError):
+        except (ValueError, TypeError):
             raise ValueError(f"Invalid ISO 8601 timestamp: {v}")
 
     @field_validator('payload')
     @classmethod
     def validate_payload_size(cls, v):
         """Prevent oversized payloads (DoS protection)"""
-        import json
-        payload_size = len(json.dumps(v).encode('utf-8'))
-        if payload_size > 100000:  # 100 KB limit per mutation
+        try:
+            payload_size = len(orjson.dumps(v))
+        except orjson.JSONEncodeError:
+            # orjson rejects integers beyond 64 bits; json.dumps still measures those
+            try:
+                payload_size = len(json.dumps(v).encode('utf-8'))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Payload is not JSON serializable: {e}")
+        if payload_size > MAX_PAYLOAD_BYTES:
             raise ValueError(f"Payload too large: {payload_size} bytes (max 100KB)")
         return v
 
@@ -100,7 +125,13 @@ class NotePayload(BaseModel):
             return v
         
         # Check for excessive special characters (potential injection)
-        special_char_ratio = sum(1 for c in v if not c.isalnum() and c not in ' \n\t.,:;!?-') / len(v)
+        rest = v.translate(_DELETE_PLAIN_ASCII)
+        if rest.isascii():
+            special_count = len(rest)
+        else:
+            # Only non-ASCII chars need the (unicode-aware) isalnum check
+            special_count = sum(1 for c in rest if not c.isalnum())
+        special_char_ratio = special_count / len(v)
         if special_char_ratio > 0.5:  # More than 50% special chars is suspicious
             raise ValueError("Note body contains too many special characters")
         
@@ -126,17 +157,31 @@ class InteractionPayload(BaseModel):
 
     @field_validator('encounterDate')
     @classmethod
-    def validate_encounter_date(cls, v):
+    def validate_encounter_date(cls, v, info: ValidationInfo):
         """Validate date is not in future"""
         try:
-            encounter = datetime.fromisoformat(v.replace('Z', '+00:00'))
-            if encounter > datetime.now(encounter.tzinfo):
+            if not _ISO_DATE_RE.match(v):
+                raise ValueError(f"Invalid isoformat string: {v!r}")
+            encounter = datetime.fromisoformat(v)
+            if encounter.tzinfo is None:
+                encounter = encounter.astimezone()  # naive dates are local time
+            # validate_mutation_list passes one "now" for the whole batch
+            now = (info.context or {}).get('now') or datetime.now(timezone.utc)
+            if encounter > now:
                 raise ValueError("Encounter date cannot be in the future")
             return v
-        except (ValueError, AttributeError) as e:
+        except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid encounter date: {str(e)}")
 
 
+# Validators are built once at import rather than per mutation
+_MUTATION_LIST_ADAPTER = TypeAdapter(List[SyncMutationValidated])
+_PAYLOAD_ADAPTERS = {
+    'notes': ('note', TypeAdapter(NotePayload)),
+    'interactions': ('interaction', TypeAdapter(InteractionPayload)),
+}
+
+
 # ==================== UTILITY FUNCTIONS ====================
 
 def validate_mutation_list(mutations: List[Dict[str, Any]]) -> tuple[List[SyncMutationValidated], List[str]]:
@@ -157,32 +202,36 @@ def validate_mutation_list(mutations: List[Dict[str, Any]]) -> tuple[List[SyncMu
     """
     valid_mutations = []
     error_messages = []
+    context = {'now': datetime.now(timezone.utc)}
+
+    try:
+        # Common case: the whole batch is valid and validates in one call
+        validated_list = _MUTATION_LIST_ADAPTER.validate_python(mutations)
+    except ValidationError:
+        # Re-validate one by one to find out which mutations failed
+        validated_list = []
+        for mutation in mutations:
+            try:
+                validated_list.append(SyncMutationValidated.model_validate(mutation))
+            except ValidationError as e:
+                validated_list.append(e)
+
+    for idx, validated in enumerate(validated_list):
+        if isinstance(validated, ValidationError):
+            error_msg = f"Mutation {idx}: {validated.error_count()} validation errors"
+            logger.warning(error_msg)
+            error_messages.append(error_msg)
+            continue
 
-    for idx, mutation in enumerate(mutations):
+        # Additional payload validation based on table type
+        label, adapter = _PAYLOAD_ADAPTERS[validated.table]
         try:
-            validated = SyncMutationValidated(**mutation)
-            
-            # Additional payload validation based on table type
-            if validated.table == 'notes':
-                try:
-                    NotePayload(**validated.payload)
-                except ValidationError as e:
-                    error_messages.append(f"Mutation {idx}: Invalid note payload - {e.error_count()} errors")
-                    continue
-            
-            elif validated.table == 'interactions':
-                try:
-                    InteractionPayload(**validated.payload)
-                except ValidationError as e:
-                    error_messages.append(f"Mutation {idx}: Invalid interaction payload - {e.error_count()} errors")
-                    continue
-            
-            valid_mutations.append(validated)
-            
+            adapter.validate_python(validated.payload, context=context)
         except ValidationError as e:
-            error_msg = f"Mutation {idx}: {e.error_count()} validation errors"
-            logger.warning(error_msg)
-            error_messages.append(error_msg)
+            error_messages.append(f"Mutation {idx}: Invalid {label} payload - {e.error_count()} errors")
+            continue
+
+        valid_mutations.append(validated)
 
     return valid_mutations, error_messages
 
@@ -1,4 +1,7 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from ..schema import Base
@@ -7,20 +10,56 @@ from ..settings import settings
 engine = create_engine(f'sqlite:///{settings.SQLITE_DB_PATH}', echo=False, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
 
-def get_db():
-    """Get SQLite connection for device registration"""
-    conn = sqlite3.connect(settings.SQLITE_DB_PATH)
-    
-    # Create device_registrations table if not exists
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS device_registrations (
-            device_id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            sf_user_id TEXT NOT NULL,
-            registered_at TEXT NOT NULL,
-            last_sync_at TEXT
-        )
-    """)
-    conn.commit()
-    
-    return conn
+# Shared connection for device registration, opened once per process;
+# sqlite3 connections are not safe for concurrent use, so every statement
+# runs under _device_db_lock (see device_db())
+_device_conn: Optional[sqlite3.Connection] = None
+_device_conn_lock = threading.Lock()
+_device_db_lock = threading.Lock()
+
+def get_db() -> sqlite3.Connection:
+    """
+    Get the shared SQLite connection for device registration.
+
+    The connection is opened (WAL mode) and the table created on first use;
+    callers must not close it. Run statements through ``device_db()`` so
+    concurrent requests never share a transaction.
+    """
+    global _device_conn
+    if _device_conn is not None:
+        return _device_conn
+
+    with _device_conn_lock:
+        if _device_conn is None:
+            conn = sqlite3.connect(settings.SQLITE_DB_PATH, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+
+            # Create device_registrations table if not exists
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS device_registrations (
+                    device_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    sf_user_id TEXT NOT NULL,
+                    registered_at TEXT NOT NULL,
+                    last_sync_at TEXT
+                )
+            """)
+            conn.commit()
+            _device_conn = conn
+
+    return _device_conn
+
+@contextmanager
+def device_db() -> Iterator[sqlite3.Connection]:
+    """
+    Hold the shared device-registration connection for one transaction.
+
+    The lock is held for the whole block and the transaction commits on exit
+    (or rolls back on error), so one thread's commit never ends another's.
+    """
+    conn = get_db()
+    with _device_db_lock:
+        with conn:
+            yield conn
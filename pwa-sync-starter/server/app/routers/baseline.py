@@ -1,9 +1,11 @@
 # server/app/routers/baseline.py
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Optional
 from datetime import datetime, timezone
-import hashlib, json
+import hashlib
+import orjson
+from operator import itemgetter
 
 from ..db import get_db  # DuckDB dependency
 from ..salesforce.audit_log_service import audit_logger
@@ -40,20 +42,25 @@ class BaselinePayload(BaseModel):
     last_refreshed_at: str
     items: List[ActiveRow]
 
+_ACTIVE_ROWS_ADAPTER = TypeAdapter(List[ActiveRow])
+
+# Columns read from each baseline row for its VIEW_PARTICIPANT audit entry
+_AUDIT_FIELDS = itemgetter("participant_uuid", "participant_sfid", "program_name", "program_code")
+
 # ---------------- util + SQL ----------------
 
 def compute_baseline_hash(items: List[dict]) -> str:
-    sorted_items = sorted(
-        items,
-        key=lambda r: (
-            (r.get("last_name") or "").lower(),
-            (r.get("first_name") or "").lower(),
-            r.get("participant_uuid") or "",
-            r.get("program_uuid") or "",
-        ),
-    )
-    payload = json.dumps(sorted_items, separators=(",", ":"), ensure_ascii=False)
-    return "sha256:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    """Hash rows that are already in baseline order (see SQL_ACTIVE_BASELINE)."""
+    # Hash the compact JSON array row by row instead of building it in memory;
+    # the digest is the same as hashing the whole serialized list at once.
+    h = hashlib.sha256(b"[")
+    separator = b""
+    for item in items:
+        h.update(separator)
+        h.update(orjson.dumps(item))
+        separator = b","
+    h.update(b"]")
+    return "sha256:" + h.hexdigest()
 
 SQL_ACTIVE_BASELINE = """
 WITH codes(code) AS /*:codes_values*/
@@ -80,7 +87,9 @@ JOIN participants p        ON p.uuid  = vap.participant_uuid
 JOIN programs pr           ON pr.uuid = vap.program_uuid
 JOIN program_enrollments e ON e.uuid  = vap.enrollment_uuid
 JOIN codes ON codes.code = pr.code
-ORDER BY lower(p.last_name), lower(p.first_name);
+-- Baseline order (also the hash order): names case-insensitively with
+-- NULLs as '', then participant and program UUIDs as tie-breakers
+ORDER BY lower(coalesce(p.last_name, '')), lower(coalesce(p.first_name, '')), p.uuid, pr.uuid;
 """
 
 # ---------------- route ----------------
@@ -99,37 +108,19 @@ def get_active_participants_baseline(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-    items = [{
-        "participant_uuid": r["participant_uuid"],
-        "participant_sfid": r.get("participant_sfid"),
-        "first_name": r.get("first_name"),
-        "last_name": r["last_name"],
-        "preferred_name": r.get("preferred_name"),
-        "program_uuid": r["program_uuid"],
-        "program_sfid": r.get("program_sfid"),
-        "program_code": r["program_code"],
-        "program_name": r["program_name"],
-        "enrollment_uuid": r["enrollment_uuid"],
-        "enrollment_sfid": r.get("enrollment_sfid"),
-        "start_date": r.get("start_date"),
-        "end_date": r.get("end_date"),
-        "status": r.get("status"),
-        "profile_complete": r.get("profile_complete"),
-        "missing_social": r.get("missing_social"),
-        "updated_at": r.get("updated_at"),
-    } for r in rows]
-
-    baseline_hash = compute_baseline_hash(items)
+    # The SQL aliases every column to its ActiveRow field name, so the rows are
+    # hashed and audited as returned and validated in a single pass below.
+    baseline_hash = compute_baseline_hash(rows)
     response.headers["ETag"] = baseline_hash
 
     sf_user_id = request.headers.get("X-SF-User-Id") or request.query_params.get("sfUserId") or request.query_params.get("userId")
     source_ip = request.client.host if request.client else None
 
-    for item in items:
-        entity_id = item.get("participant_uuid") or item.get("participant_sfid")
+    for participant_uuid, participant_sfid, program_name, program_code in map(_AUDIT_FIELDS, rows):
+        entity_id = participant_uuid or participant_sfid
         if not entity_id:
             continue
-        details = f"Baseline participant view for program {item.get('program_name')} ({item.get('program_code')})"
+        details = f"Baseline participant view for program {program_name} ({program_code})"
         audit_logger.log_action(
             action_type="VIEW_PARTICIPANT",
             entity_id=entity_id,
@@ -143,5 +134,5 @@ def get_active_participants_baseline(
     return BaselinePayload(
         baseline_hash=baseline_hash,
         last_refreshed_at=now,
-        items=items
+        items=_ACTIVE_ROWS_ADAPTER.validate_python(rows)
     )
@@ -1,7 +1,8 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from datetime import datetime
-from ..models.db import get_db
+from ..models.db import device_db
 
 router = APIRouter(prefix="/api/device", tags=["device"])
 
@@ -10,12 +11,9 @@ class DeviceRegistration(BaseModel):
     userId: str
     sfUserId: str
 
-@router.post("/register")
-async def register_device(registration: DeviceRegistration):
-    """Register device with user for offline-first usage"""
-    db = get_db()
-    
-    try:
+def _upsert_registration(registration: DeviceRegistration) -> None:
+    now = datetime.utcnow().isoformat()
+    with device_db() as db:
         # Upsert device registration
         db.execute("""
             INSERT OR REPLACE INTO device_registrations 
@@ -25,10 +23,23 @@ async def register_device(registration: DeviceRegistration):
             registration.deviceId,
             registration.userId, 
             registration.sfUserId,
-            datetime.utcnow().isoformat(),
-            datetime.utcnow().isoformat()
+            now,
+            now
         ))
-        db.commit()
+
+def _fetch_device_user(device_id: str):
+    with device_db() as db:
+        return db.execute("""
+            SELECT user_id, sf_user_id FROM device_registrations 
+            WHERE device_id = ?
+        """, (device_id,)).fetchone()
+
+@router.post("/register")
+async def register_device(registration: DeviceRegistration):
+    """Register device with user for offline-first usage"""
+    try:
+        # SQLite calls block, so keep them (and the commit) off the event loop
+        await asyncio.to_thread(_upsert_registration, registration)
         
         return {"success": True, "message": "Device registered successfully"}
         
@@ -38,12 +49,7 @@ async def register_device(registration: DeviceRegistration):
 @router.get("/user/{device_id}")
 async def get_device_user(device_id: str):
     """Get user info for registered device"""
-    db = get_db()
-    
-    result = db.execute("""
-        SELECT user_id, sf_user_id FROM device_registrations 
-        WHERE device_id = ?
-    """, (device_id,)).fetchone()
+    result = await asyncio.to_thread(_fetch_device_user, device_id)
     
     if not result:
         raise HTTPException(status_code=404, detail="Device not registered")
@@ -51,4 +57,4 @@ async def get_device_user(device_id: str):
     return {
         "userId": result[0],
         "sfUserId": result[1]
-    }
\ No newline at end of file
+    }
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Tuple
 import logging
 
 from ..salesforce.assessment_service import AssessmentServiceClient
@@ -35,6 +36,12 @@ class SSRSAssessmentData(BaseModel):
     class Config:
         extra = "allow"
 
+# Yes/no answers of SSRSAssessmentData; each True answer adds one to the score
+_BOOL_FIELDS = tuple(
+    name for name, field in SSRSAssessmentData.model_fields.items()
+    if field.annotation in (bool, Optional[bool])
+)
+
 class SSRSAssessmentRequest(BaseModel):
     accountId: str
     caseId: Optional[str] = None
@@ -47,47 +54,96 @@ class SSRSAssessmentResult(BaseModel):
     caseId: str
     totalScore: Optional[int] = None
     riskLevel: str
-    recommendations: List[str]
+    recommendations: Tuple[str, ...]
     taskCreated: bool = False
 
-@router.post("/ssrs-assessment", response_model=SSRSAssessmentResult)
-async def submit_ssrs_assessment(request: SSRSAssessmentRequest):
+# ---------------- risk tiers ----------------
+
+_RECOMMENDATIONS = {
+    "Imminent": (
+        "Immediate intervention required",
+        "Do not leave person alone",
+        "Contact crisis team immediately",
+    ),
+    "High": (
+        "Schedule follow-up within 24-48 hours",
+        "Implement safety plan",
+        "Consider hospitalization",
+    ),
+    "Moderate": (
+        "Schedule follow-up within 1 week",
+        "Provide crisis resources",
+        "Monitor closely",
+    ),
+    "Low": (
+        "Continue regular check-ins",
+        "Monitor for changes",
+    ),
+}
+
+# Answer bits used to index _RISK_TABLE
+_PLAN, _INTENT, _ATTEMPT_3M, _THOUGHTS, _METHODS, _WISH_DEAD = 32, 16, 8, 4, 2, 1
+
+def _risk_level(flags: int) -> str:
+    """Risk tier rules for a combination of answer bits."""
+    if flags & _PLAN and flags & _INTENT:
+        return "Imminent"
+    if flags & _ATTEMPT_3M or (flags & _THOUGHTS and flags & _METHODS):
+        return "High"
+    if flags & _THOUGHTS or flags & _WISH_DEAD:
+        return "Moderate"
+    return "Low"
+
+# (risk_level, recommendations) for every combination of the six answers
+_RISK_TABLE = tuple(
+    (level, _RECOMMENDATIONS[level]) for level in map(_risk_level, range(64))
+)
+
+# Request body schema for the OpenAPI docs, with the nested assessment model
+# inlined since the body is parsed by hand rather than declared as a parameter
+_REQUEST_SCHEMA = SSRSAssessmentRequest.model_json_schema()
+_REQUEST_SCHEMA["properties"]["assessmentData"] = _REQUEST_SCHEMA.pop("$defs")["SSRSAssessmentData"]
+
+@router.post(
+    "/ssrs-assessment",
+    response_model=SSRSAssessmentResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _REQUEST_SCHEMA}},
+        }
+    },
+)
+async def submit_ssrs_assessment(http_request: Request):
     """Submit SSRS Assessment and create/update case as needed"""
+    # Parse and validate the raw body in one pass inside pydantic-core instead
+    # of json.loads() into a dict followed by model validation
+    try:
+        request = SSRSAssessmentRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Same error shape FastAPI produces for body parameters: loc starts with "body"
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
     try:
         # Normalize payloads
-        assessment_dict = request.assessmentData.dict(exclude_none=True)
-        bool_score = sum(1 for value in assessment_dict.values() if isinstance(value, bool) and value)
+        data = request.assessmentData
+        assessment_dict = data.model_dump(exclude_none=True)
+        bool_score = sum(1 for name in _BOOL_FIELDS if getattr(data, name) is True)
+        if data.model_extra:
+            # Extra answers are allowed and count toward the score as well
+            bool_score += sum(1 for value in data.model_extra.values() if value is True)
         
         # Determine risk tier + recommendations
-        if request.assessmentData.planLifetime and request.assessmentData.intentLifetime:
-            risk_level = "Imminent"
-            recommendations = [
-                "Immediate intervention required",
-                "Do not leave person alone", 
-                "Contact crisis team immediately"
-            ]
-        elif request.assessmentData.actualAttemptPast3Months or (
-            request.assessmentData.suicidalThoughtsLifetime and request.assessmentData.methodsLifetime
-        ):
-            risk_level = "High"
-            recommendations = [
-                "Schedule follow-up within 24-48 hours",
-                "Implement safety plan",
-                "Consider hospitalization"
-            ]
-        elif request.assessmentData.suicidalThoughtsLifetime or request.assessmentData.wishDeadLifetime:
-            risk_level = "Moderate"
-            recommendations = [
-                "Schedule follow-up within 1 week",
-                "Provide crisis resources",
-                "Monitor closely"
-            ]
-        else:
-            risk_level = "Low"
-            recommendations = [
-                "Continue regular check-ins",
-                "Monitor for changes"
-            ]
+        risk_level, recommendations = _RISK_TABLE[
+            (_PLAN if data.planLifetime else 0)
+            | (_INTENT if data.intentLifetime else 0)
+            | (_ATTEMPT_3M if data.actualAttemptPast3Months else 0)
+            | (_THOUGHTS if data.suicidalThoughtsLifetime else 0)
+            | (_METHODS if data.methodsLifetime else 0)
+            | (_WISH_DEAD if data.wishDeadLifetime else 0)
+        ]
 
         mapped_fields = assessment_service.build_field_payload(assessment_dict)
 
@@ -1,25 +1,64 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import Dict, List, Tuple
 from pydantic import BaseModel
+import asyncio
+import functools
+import httpx
 import jwt
 import os
-import requests
+import time
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+# Access tokens are reused for this long, and re-minted once within
+# TOKEN_REFRESH_MARGIN seconds of that age
+TOKEN_CACHE_SECONDS = 14 * 60
+TOKEN_REFRESH_MARGIN = 60
+
+# SF_ENV -> (access_token, instance_url, expires_at); expires_at is on the time.monotonic() clock
+_token_cache: Dict[str, Tuple[str, str, float]] = {}
+# One lock per SF_ENV so concurrent requests share a single token exchange
+_token_locks: Dict[str, asyncio.Lock] = {}
+
+# Shared async client so Salesforce calls don't block the event loop and
+# reuse pooled connections across requests
+_http_client = httpx.AsyncClient(timeout=30.0)
+
+@router.on_event("shutdown")
+async def _close_http_client():
+    await _http_client.aclose()
+
 class OutreachUser(BaseModel):
     id: str
     name: str
     email: str
     sfUserId: str
 
-@router.get("/outreach", response_model=List[OutreachUser])
-async def get_outreach_users():
-    """Get list of outreach users from Salesforce"""
-    try:
-        # Get JWT token for Salesforce
-        env = os.getenv('SF_ENV', 'benefits')
-        
+@functools.lru_cache(maxsize=None)
+def _read_private_key(private_key_path: str) -> str:
+    """Read a JWT signing key once per path."""
+    with open(private_key_path, 'r') as key_file:
+        return key_file.read()
+
+def _cached_token(env: str):
+    cached = _token_cache.get(env)
+    if cached and cached[2] - time.monotonic() > TOKEN_REFRESH_MARGIN:
+        return cached[0], cached[1]
+    return None
+
+async def _get_sf_token(env: str) -> Tuple[str, str]:
+    """Return (access_token, instance_url) for SF_ENV, minting a new token only when needed."""
+    token = _cached_token(env)
+    if token:
+        return token
+
+    lock = _token_locks.setdefault(env, asyncio.Lock())
+    async with lock:
+        # Another request may have refreshed the token while we waited
+        token = _cached_token(env)
+        if token:
+            return token
+
         if env == 'benefits':
             client_id = os.getenv('SF_BENEFITS_JWT_CONSUMER_KEY')
             username = os.getenv('SF_BENEFITS_JWT_USERNAME')
@@ -31,8 +70,7 @@ async def get_outreach_users():
             private_key_path = os.getenv('SF_PROD_JWT_PRIVATE_KEY_PATH', '../jwt_private.key')
             token_url = 'https://tgthrnpc.my.salesforce.com/services/oauth2/token'
 
-        with open(private_key_path, 'r') as key_file:
-            private_key = key_file.read()
+        private_key = _read_private_key(private_key_path)
             
         # Create JWT assertion
         now = int(jwt.utils.get_int_from_datetime(jwt.utils.datetime.datetime.now()))
@@ -46,16 +84,27 @@ async def get_outreach_users():
         assertion = jwt.encode(claim, private_key, algorithm='RS256')
         
         # Get access token
-        token_response = requests.post(token_url, data={
+        token_response = await _http_client.post(token_url, data={
             'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
             'assertion': assertion
         })
         
-        if not token_response.ok:
+        if not token_response.is_success:
             raise HTTPException(status_code=500, detail="Failed to get Salesforce access token")
             
-        access_token = token_response.json()['access_token']
-        instance_url = token_response.json()['instance_url']
+        token_json = token_response.json()
+        access_token = token_json['access_token']
+        instance_url = token_json['instance_url']
+        _token_cache[env] = (access_token, instance_url, time.monotonic() + TOKEN_CACHE_SECONDS)
+        return access_token, instance_url
+
+@router.get("/outreach", response_model=List[OutreachUser])
+async def get_outreach_users():
+    """Get list of outreach users from Salesforce"""
+    try:
+        # Get JWT token for Salesforce
+        env = os.getenv('SF_ENV', 'benefits')
+        access_token, instance_url = await _get_sf_token(env)
         
         # Query Salesforce for users
         query = """
@@ -70,13 +119,16 @@ async def get_outreach_users():
             'Content-Type': 'application/json'
         }
         
-        response = requests.get(
+        response = await _http_client.get(
             f"{instance_url}/services/data/v57.0/query",
             params={'q': query},
             headers=headers
         )
         
-        if not response.ok:
+        if not response.is_success:
+            if response.status_code == 401:
+                # Cached token was revoked or expired early; mint a new one next time
+                _token_cache.pop(env, None)
             raise HTTPException(status_code=500, detail="Failed to query Salesforce users")
             
         users = []
@@ -1,9 +1,11 @@
 import json
 import logging
 from datetime import date, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple
 
-from .sf_client import SalesforceClient
+import orjson
+
+from .sf_client import SalesforceClient, get_sf_client
 
 logger = logging.getLogger("assessment_service")
 
@@ -123,19 +125,91 @@ PICKLIST_VALUE_MAPS: Dict[str, Dict[int, str]] = {
     "Reason_for_Ideation__c": REASON_OPTIONS,
 }
 
+# Picklist fields filled from the recent-period answer when the lifetime one is missing
+# (field, primary key, secondary key, combine with boolean OR) applied after FIELD_MAP:
+# picklist fields take the first non-null answer unless already mapped, the
+# OR field is true when either answer is truthy
+FALLBACK_RULES: Tuple[Tuple[str, str, str, bool], ...] = (
+    ("Frequency__c", "frequencyLifetime", "frequencyRecent", False),
+    ("Duration_of_Thoughts__c", "durationLifetime", "durationRecent", False),
+    ("Controllability_of_Thoughts__c", "controllabilityLifetime", "controllabilityRecent", False),
+    ("Deterrents_from_Acting__c", "deterrentsLifetime", "deterrentsRecent", False),
+    ("Reason_for_Ideation__c", "reasonsLifetime", "reasonsRecent", False),
+    (
+        "Non_Suicidal_Self_Injurious_Harm__c",
+        "nonSuicidalSelfInjuryLifetime",
+        "nonSuicidalSelfInjuryPast3Months",
+        True,
+    ),
+)
+
+# (rich text field, lifetime description key, recent description key)
+DESCRIPTION_FIELD_COMBOS = (
+    ("Wish_to_be_Dead_Description__c", "wishDeadLifetimeDesc", "wishDeadPastMonthDesc"),
+    ("Non_Specific_Active_Thoughts_Description__c", "suicidalThoughtsLifetimeDesc", "suicidalThoughtsPastMonthDesc"),
+    ("No_Plan_No_Intent_Description__c", "methodsLifetimeDesc", "methodsPastMonthDesc"),
+    ("Some_Intent_No_Plan_Description__c", "intentLifetimeDesc", "intentPastMonthDesc"),
+    ("Active_Plan_Intent_Description__c", "planLifetimeDesc", "planPastMonthDesc"),
+)
+
+# Picklist options as tuples indexed by option number (None for unused
+# numbers), plus each picklist's labels for recognising already-mapped values
+_PICKLIST_BY_INDEX: Dict[str, Tuple[Optional[str], ...]] = {
+    field_name: tuple(options.get(i) for i in range(max(options) + 1))
+    for field_name, options in PICKLIST_VALUE_MAPS.items()
+}
+_PICKLIST_LABELS: Dict[str, FrozenSet[str]] = {
+    field_name: frozenset(options.values())
+    for field_name, options in PICKLIST_VALUE_MAPS.items()
+}
+
+# Risk levels that get a follow-up Task, and those due next day at high priority
+_TASK_RISK_LEVELS = frozenset({"Moderate", "High", "Imminent"})
+_URGENT_RISK_LEVELS = frozenset({"High", "Imminent"})
+
+# (describe result, its field names, FIELD_MAP pairs whose field exists,
+# DESCRIPTION_FIELD_COMBOS whose field exists), shared by every AssessmentServiceClient
+_assessment_schema: Tuple[
+    Optional[Dict[str, Any]],
+    FrozenSet[str],
+    Tuple[Tuple[str, str], ...],
+    Tuple[Tuple[str, str, str], ...],
+] = (None, frozenset(), (), ())
+
+
+
+def _encode_response_data(payload: Dict[str, Any]) -> str:
+    """Serialize the raw submission for Response_Data__c; orjson rejects integers beyond
+    64 bits, which json.dumps encodes, so those payloads fall back to the stdlib"""
+    try:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(payload)
+
 
 class AssessmentServiceClient:
     """Maps SSRS assessment payloads to Assessment__c and creates records in Salesforce."""
 
-    def __init__(self):
-        self.sf_client = SalesforceClient()
-        self._assessment_fields: Optional[Dict[str, Dict[str, Any]]] = None
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
 
-    def _get_assessment_fields(self) -> Dict[str, Dict[str, Any]]:
-        if self._assessment_fields is None:
-            desc = self.sf_client.describe("Assessment__c")
-            self._assessment_fields = {f["name"]: f for f in desc.get("fields", [])}
-        return self._assessment_fields
+    def _get_schema(
+        self,
+    ) -> Tuple[FrozenSet[str], Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str, str], ...]]:
+        """Assessment__c field names, effective FIELD_MAP and description combos,
+        rebuilt only when the cached describe changes."""
+        global _assessment_schema
+        desc = self.sf_client.describe("Assessment__c")
+        cached_desc, names, field_map, description_combos = _assessment_schema
+        if desc is not cached_desc:
+            names = frozenset(f["name"] for f in desc.get("fields", []))
+            field_map = tuple((k, v) for k, v in FIELD_MAP.items() if v in names)
+            description_combos = tuple(combo for combo in DESCRIPTION_FIELD_COMBOS if combo[0] in names)
+            _assessment_schema = (desc, names, field_map, description_combos)
+        return names, field_map, description_combos
+
+    def _get_assessment_fields(self) -> FrozenSet[str]:
+        return self._get_schema()[0]
 
     def _field_exists(self, api_name: str) -> bool:
         return api_name in self._get_assessment_fields()
@@ -143,42 +217,33 @@ class AssessmentServiceClient:
     def build_field_payload(self, assessment_data: Dict[str, Any]) -> Dict[str, Any]:
         """Translate SSRSAssessmentData keys to Assessment__c fields, respecting org schema."""
         payload: Dict[str, Any] = {}
-        clean_data = {k: v for k, v in assessment_data.items() if v is not None}
 
-        for source_key, field_name in FIELD_MAP.items():
-            if source_key not in clean_data:
-                continue
-            if not self._field_exists(field_name):
+        # Only FIELD_MAP entries whose field exists in the org are walked
+        for source_key, field_name in self._get_schema()[1]:
+            value = assessment_data.get(source_key)
+            if value is None:
                 continue
-            payload[field_name] = self._normalize_picklist_value(field_name, clean_data[source_key])
+            if field_name in _PICKLIST_BY_INDEX:
+                value = self._normalize_picklist_value(field_name, value)
+            payload[field_name] = value
 
         return payload
 
     def _merge_description_fields(self, record: Dict[str, Any], assessment_data: Dict[str, Any]) -> None:
         """Combine lifetime/past period descriptions into single Salesforce rich text fields."""
-        combos = [
-            ("Wish_to_be_Dead_Description__c", "wishDeadLifetimeDesc", "wishDeadPastMonthDesc"),
-            ("Non_Specific_Active_Thoughts_Description__c", "suicidalThoughtsLifetimeDesc", "suicidalThoughtsPastMonthDesc"),
-            ("No_Plan_No_Intent_Description__c", "methodsLifetimeDesc", "methodsPastMonthDesc"),
-            ("Some_Intent_No_Plan_Description__c", "intentLifetimeDesc", "intentPastMonthDesc"),
-            ("Active_Plan_Intent_Description__c", "planLifetimeDesc", "planPastMonthDesc"),
-        ]
-
-        for field_name, lifetime_key, recent_key in combos:
-            if not self._field_exists(field_name):
-                continue
+        for field_name, lifetime_key, recent_key in self._get_schema()[2]:
             lifetime_text = assessment_data.get(lifetime_key)
             recent_text = assessment_data.get(recent_key)
-            if not lifetime_text and not recent_text:
-                continue
-
-            sections = []
             if lifetime_text:
-                sections.append(f"Lifetime:\n{lifetime_text.strip()}")
-            if recent_text:
-                sections.append(f"Recent/Past Month:\n{recent_text.strip()}")
-
-            record[field_name] = "\n\n".join(sections)
+                if recent_text:
+                    record[field_name] = "".join((
+                        "Lifetime:\n", lifetime_text.strip(),
+                        "\n\nRecent/Past Month:\n", recent_text.strip(),
+                    ))
+                else:
+                    record[field_name] = "Lifetime:\n" + lifetime_text.strip()
+            elif recent_text:
+                record[field_name] = "Recent/Past Month:\n" + recent_text.strip()
 
     def create_assessment(
         self,
@@ -214,96 +279,64 @@ class AssessmentServiceClient:
         if self._field_exists("Risk_Level__c"):
             record["Risk_Level__c"] = risk_level
         if self._field_exists("Response_Data__c"):
-            record["Response_Data__c"] = json.dumps(raw_payload)
+            record["Response_Data__c"] = _encode_response_data(raw_payload)
 
         logger.info("Creating Assessment__c for account %s (case %s)", account_id, case_id)
         result = self.sf_client.create("Assessment__c", record)
         return result.get("id") or result.get("Id")
 
     def _normalize_picklist_value(self, field_name: str, raw_value: Any) -> Any:
-        if field_name not in PICKLIST_VALUE_MAPS:
+        options = _PICKLIST_BY_INDEX.get(field_name)
+        if options is None or raw_value is None:
             return raw_value
-        mapping = PICKLIST_VALUE_MAPS[field_name]
-        if raw_value is None:
-            return None
         if isinstance(raw_value, str):
-            if raw_value in mapping.values():
+            if raw_value in _PICKLIST_LABELS[field_name]:
                 return raw_value
             try:
                 raw_value = int(raw_value)
             except ValueError:
                 return raw_value
         if isinstance(raw_value, (int, float)):
-            return mapping.get(int(raw_value), raw_value)
+            index = int(raw_value)
+            label = options[index] if 0 <= index < len(options) else None
+            return raw_value if label is None else label
         return str(raw_value)
 
     def _apply_additional_field_logic(self, record: Dict[str, Any], data: Dict[str, Any]) -> None:
-        self._apply_fallback_value(record, data, "Frequency__c", "frequencyLifetime", "frequencyRecent")
-        self._apply_fallback_value(
-            record, data, "Duration_of_Thoughts__c", "durationLifetime", "durationRecent"
-        )
-        self._apply_fallback_value(
-            record, data, "Controllability_of_Thoughts__c", "controllabilityLifetime", "controllabilityRecent"
-        )
-        self._apply_fallback_value(
-            record, data, "Deterrents_from_Acting__c", "deterrentsLifetime", "deterrentsRecent"
-        )
-        self._apply_fallback_value(
-            record, data, "Reason_for_Ideation__c", "reasonsLifetime", "reasonsRecent"
-        )
-        self._apply_boolean_or(
-            record,
-            data,
-            "Non_Suicidal_Self_Injurious_Harm__c",
-            "nonSuicidalSelfInjuryLifetime",
-            "nonSuicidalSelfInjuryPast3Months",
-        )
-
-    def _apply_fallback_value(
-        self,
-        record: Dict[str, Any],
-        data: Dict[str, Any],
-        field_name: str,
-        primary_key: str,
-        secondary_key: str,
-    ) -> None:
-        if field_name in record:
-            return
-        for key in (primary_key, secondary_key):
-            if key in data and data[key] is not None:
-                record[field_name] = self._normalize_picklist_value(field_name, data[key])
-                return
-
-    def _apply_boolean_or(
-        self,
-        record: Dict[str, Any],
-        data: Dict[str, Any],
-        field_name: str,
-        primary_key: str,
-        secondary_key: str,
-    ) -> None:
-        primary = data.get(primary_key)
-        secondary = data.get(secondary_key)
-        if primary is None and secondary is None:
-            return
-        record[field_name] = bool(primary) or bool(secondary)
+        get = data.get
+        normalize = self._normalize_picklist_value
+        for field_name, primary_key, secondary_key, is_or in FALLBACK_RULES:
+            if is_or:
+                primary = get(primary_key)
+                secondary = get(secondary_key)
+                if primary is not None or secondary is not None:
+                    record[field_name] = bool(primary) or bool(secondary)
+                continue
+            if field_name in record:
+                continue
+            value = get(primary_key)
+            if value is None:
+                value = get(secondary_key)
+                if value is None:
+                    continue
+            record[field_name] = normalize(field_name, value)
 
     def create_follow_up_task(
         self,
         *,
         case_id: Optional[str],
         risk_level: str,
-        recommendations: list[str],
+        recommendations: Sequence[str],
     ) -> bool:
         """Create a Salesforce Task for moderate/high risk assessments."""
-        if risk_level not in ("Moderate", "High", "Imminent"):
+        if risk_level not in _TASK_RISK_LEVELS:
             return False
         if not case_id:
             logger.warning("Skipping follow-up task because caseId is missing.")
             return False
 
-        due_days = 1 if risk_level == "High" or risk_level == "Imminent" else 7
-        activity_date = date.today() + timedelta(days=due_days)
+        urgent = risk_level in _URGENT_RISK_LEVELS
+        activity_date = date.today() + timedelta(days=1 if urgent else 7)
 
         description_lines = [
             f"Risk Level: {risk_level}",
@@ -315,7 +348,7 @@ class AssessmentServiceClient:
             "WhatId": case_id,
             "Subject": f"SSRS Assessment Follow-up - {risk_level} Risk",
             "Description": "\n".join(description_lines),
-            "Priority": "High" if risk_level in ("High", "Imminent") else "Normal",
+            "Priority": "High" if urgent else "Normal",
             "Status": "Not Started",
             "ActivityDate": activity_date.isoformat(),
         }
@@ -1,22 +1,161 @@
 from __future__ import annotations
 
-import json
+import atexit
+import functools
 import logging
+import queue
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from .sf_client import SalesforceClient, SFError
+import orjson
+
+from .sf_client import SalesforceClient, SFError, get_sf_client
 
 logger = logging.getLogger("audit_log")
 
+# Bound on queued audit records; new records are dropped (and counted) when full
+LOG_QUEUE_MAXSIZE = 10000
+
+# Maximum records per Composite post (Salesforce allows up to 200)
+LOG_BATCH_SIZE = 200
+
+# Seconds to wait for more records before posting a partial batch
+LOG_BATCH_MAX_WAIT = 0.5
+
+# Queued by stop() to tell the writer thread to flush and exit
+_STOP = object()
+
+# Salesforce field lengths for Audit_Log__c
+TEXT_FIELD_MAX = 255
+DESCRIPTION_MAX = 32768
+AUDIT_JSON_MAX = 131000
+
+# Key prefixes of the standard objects audited by id rather than UUID
+# (Account, Contact, User, Case, Task, Event, ContentVersion, ContentDocument)
+_SF_KEY_PREFIXES = frozenset({"001", "003", "005", "500", "00T", "00U", "068", "069"})
+
+# Stored in Audit_JSON__c when the audit payload cannot be serialized
+_SERIALIZATION_ERROR = '{"error": "serialization_failed"}'
+
+# Picklist values for internal event type tokens, in every casing callers use
+_EVENT_TYPES = {
+    variant: value
+    for token, value in (
+        ("ACCESS", "Access"),
+        ("MODIFY", "Modify"),
+        ("CREATE", "Create"),
+        ("DELETE", "Delete"),
+        ("VIEW", "View"),
+    )
+    for variant in (token, token.lower(), value)
+}
+
+
+def _trim(value: str, limit: int) -> str:
+    """Cap ``value`` at ``limit`` characters, without copying strings that already fit."""
+    return value if len(value) <= limit else value[:limit]
+
+
+def _encode_audit_json(value: Any) -> str:
+    """
+    Serialize ``value`` for Audit_JSON__c, capped at AUDIT_JSON_MAX characters.
+    Oversized payloads are cut on the encoded bytes before decoding, so only
+    the kept prefix is decoded (a split trailing character is dropped).
+    """
+    try:
+        # Values orjson has no native encoding for (Decimal, custom objects) are stringified
+        encoded = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return _SERIALIZATION_ERROR
+    if len(encoded) <= AUDIT_JSON_MAX:
+        return encoded.decode()
+    return encoded[:AUDIT_JSON_MAX].decode(errors="ignore")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO-8601, taken per event so audit entries keep their exact order."""
+    return datetime.now(timezone.utc).isoformat()
+
 
 class AuditLogService:
     """Thin wrapper for writing Audit_Log__c records in Salesforce."""
 
     OBJECT_NAME = "Audit_Log__c"
 
-    def __init__(self) -> None:
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None) -> None:
+        self.sf_client = sf_client or get_sf_client()
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self.dropped_records = 0
+
+    def start(self) -> None:
+        """Start the background writer thread (call on app startup)."""
+        if self._writer is not None:
+            return
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+        self._writer = threading.Thread(
+            target=self._run_writer, args=(self._queue,), name="audit-log-writer", daemon=True
+        )
+        self._writer.start()
+        # Covers scripts and workers that never run the app's shutdown hook
+        atexit.register(self.stop)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until records queued so far have been sent; False if ``timeout`` expires first."""
+        pending = self._queue
+        if pending is None:
+            return True
+        done = threading.Event()
+        pending.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush queued records (up to ``timeout`` seconds) and stop the writer thread."""
+        if self._writer is None:
+            return
+        pending, writer = self._queue, self._writer
+        self._queue = None
+        self._writer = None
+        pending.put(_STOP)
+        writer.join(timeout)
+        if writer.is_alive():
+            logger.warning("Audit log writer not drained on shutdown: %s records pending", pending.qsize())
+
+    def _run_writer(self, pending: queue.Queue) -> None:
+        """
+        Collect queued records into batches and create each batch in one Composite call.
+        A batch is sent when it reaches LOG_BATCH_SIZE or LOG_BATCH_MAX_WAIT
+        seconds after its first record, whichever comes first.
+        """
+        stopping = False
+        while not stopping:
+            record = pending.get()
+            if record is _STOP:
+                return
+            if isinstance(record, threading.Event):
+                record.set()
+                continue
+            batch = [record]
+            flushed = []
+            deadline = time.monotonic() + LOG_BATCH_MAX_WAIT
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    record = pending.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                if isinstance(record, threading.Event):
+                    # flush() marker: send what we have now
+                    flushed.append(record)
+                    break
+                batch.append(record)
+            self.log_records(batch)
+            for done in flushed:
+                done.set()
 
     def log_action(
         self,
@@ -26,7 +165,7 @@ class AuditLogService:
         *,
         user_id: Optional[str] = None,
         application: str = "PWA",
-        audit_json: Optional[Dict[str, Any]] = None,
+        audit_json: Optional[Any] = None,
         compliance_reference: Optional[str] = None,
         created_by_integration: bool = True,
         event_type: Optional[str] = None,
@@ -34,16 +173,86 @@ class AuditLogService:
         status: Optional[str] = None,
         timestamp: Optional[str] = None,
     ) -> None:
+        record = self.build_record(
+            action_type,
+            entity_id,
+            details,
+            user_id=user_id,
+            application=application,
+            audit_json=audit_json,
+            compliance_reference=compliance_reference,
+            created_by_integration=created_by_integration,
+            event_type=event_type,
+            source_ip=source_ip,
+            status=status,
+            timestamp=timestamp,
+        )
+
+        # Hand the record to the writer thread so callers never wait on Salesforce;
+        # falls back to writing inline if the writer has not been started
+        pending = self._queue
+        if pending is not None:
+            try:
+                pending.put_nowait(record)
+            except queue.Full:
+                self.dropped_records += 1
+                logger.error("Audit log queue full; dropped record (%s total)", self.dropped_records)
+            return
+
+        try:
+            self.sf_client.create(self.OBJECT_NAME, record)
+        except SFError as exc:
+            logger.error("Failed to create audit log entry: %s", exc)
+        except Exception as exc:
+            logger.error("Unexpected error writing audit log: %s", exc, exc_info=True)
+
+    def log_records(self, records: List[Dict[str, Any]]) -> None:
+        """Create several records from build_record() in one Composite request."""
+        if not records:
+            return
+        try:
+            results = self.sf_client.create_many(self.OBJECT_NAME, records)
+        except SFError as exc:
+            logger.error("Failed to create %s audit log entries: %s", len(records), exc)
+            return
+        except Exception as exc:
+            logger.error("Unexpected error writing %s audit log entries: %s", len(records), exc, exc_info=True)
+            return
+
+        for record, result in zip(records, results):
+            if not result.get("success"):
+                logger.error(
+                    "Audit log entry %s at %s rejected: %s",
+                    record.get('Action__c'), record.get('Timestamp__c'), result.get('errors'),
+                )
+
+    def build_record(
+        self,
+        action_type: str,
+        entity_id: Optional[str],
+        details: str,
+        *,
+        user_id: Optional[str] = None,
+        application: str = "PWA",
+        audit_json: Optional[Any] = None,
+        compliance_reference: Optional[str] = None,
+        created_by_integration: bool = True,
+        event_type: Optional[str] = None,
+        source_ip: Optional[str] = None,
+        status: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the Audit_Log__c field map for one action."""
         record: Dict[str, Any] = {
-            "Action__c": (action_type or "UNKNOWN")[:255],
-            "Description__c": details[:32768] if details else "",
-            "Application__c": application[:255] if application else "PWA",
+            "Action__c": _trim(action_type, TEXT_FIELD_MAX) if action_type else "UNKNOWN",
+            "Description__c": _trim(details, DESCRIPTION_MAX) if details else "",
+            "Application__c": _trim(application, TEXT_FIELD_MAX) if application else "PWA",
             "Created_by_Integration__c": created_by_integration,
-            "Timestamp__c": timestamp or datetime.now(timezone.utc).isoformat(),
+            "Timestamp__c": timestamp or _utc_timestamp(),
         }
 
         if entity_id:
-            if entity_id.startswith("001"):
+            if entity_id[:3] in _SF_KEY_PREFIXES and len(entity_id) in (15, 18):
                 record["Record_Id__c"] = entity_id
             else:
                 record["UUID__c"] = entity_id
@@ -55,23 +264,16 @@ class AuditLogService:
             if normalized:
                 record["Event_Type__c"] = normalized
         if source_ip:
-            record["Source_IP__c"] = source_ip[:255]
+            record["Source_IP__c"] = _trim(source_ip, TEXT_FIELD_MAX)
         if compliance_reference:
-            record["Compliance_Reference__c"] = compliance_reference[:255]
+            record["Compliance_Reference__c"] = _trim(compliance_reference, TEXT_FIELD_MAX)
         if status:
-            record["Status__c"] = status[:255]
+            record["Status__c"] = _trim(status, TEXT_FIELD_MAX)
         if audit_json:
-            try:
-                record["Audit_JSON__c"] = json.dumps(audit_json)[:131000]
-            except (TypeError, ValueError):
-                record["Audit_JSON__c"] = json.dumps({"error": "serialization_failed"})
+            # audit_json may be a dict or a dataclass such as AuditRecord
+            record["Audit_JSON__c"] = _encode_audit_json(audit_json)
 
-        try:
-            self.sf_client.create(self.OBJECT_NAME, record)
-        except SFError as exc:
-            logger.error(f"Failed to create audit log entry: {exc}")
-        except Exception as exc:
-            logger.error(f"Unexpected error writing audit log: {exc}", exc_info=True)
+        return record
 
     @staticmethod
     def _normalize_event_type(event_type: str) -> Optional[str]:
@@ -79,20 +281,22 @@ class AuditLogService:
         if not event_type:
             return None
 
-        lookup = {
-            "ACCESS": "Access",
-            "MODIFY": "Modify",
-            "CREATE": "Create",
-            "DELETE": "Delete",
-            "VIEW": "View",
-        }
+        normalized = _EVENT_TYPES.get(event_type)
+        if normalized is not None:
+            return normalized
 
         upper = event_type.upper()
-        if upper in lookup:
-            return lookup[upper]
+        if upper in _EVENT_TYPES:
+            return _EVENT_TYPES[upper]
+
+        return _trim(event_type.title(), TEXT_FIELD_MAX)
+
+
 
-        title_case = event_type.title()
-        return title_case[:255]
+@functools.lru_cache(maxsize=None)
+def get_audit_logger() -> AuditLogService:
+    """Process-wide AuditLogService (its writer thread is started by the app on startup)."""
+    return AuditLogService()
 
 
-audit_logger = AuditLogService()
+audit_logger = get_audit_logger()
@@ -1,51 +1,97 @@
 # server/app/salesforce/case_service.py
 import logging
-from typing import Dict, Any, List
-from .sf_client import SalesforceClient
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from .sf_client import SalesforceClient, get_sf_client
 
 logger = logging.getLogger("case_service")
 
+# Active case lists are served from memory for this long after a query
+ACTIVE_CASES_CACHE_TTL = 15
+ACTIVE_CASES_CACHE_SIZE = 1024
+
+# {user_id: (expires_at, cases)} - expires_at is on the time.monotonic() clock
+_active_cases_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_active_cases_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Kept as one fixed text so every user's query is byte-identical apart from the bound id
+_ACTIVE_CASES_SOQL = (
+    "SELECT Id, CaseNumber, AccountId, Account.Id, Account.Name, "
+    "Contact.Id, Contact.Name, Status, Subject "
+    "FROM Case "
+    "WHERE OwnerId = :userId "
+    "AND Status IN ('New', 'Working', 'Escalated', 'In Progress', 'Active') "
+    "ORDER BY CreatedDate DESC "
+    "LIMIT 100"
+)
+
+
+def _map_case(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a Case query record onto the shape returned to the PWA."""
+    # Id and the selected scalar fields are always present in query results
+    account = record['Account']
+    return {
+        'Id': record['Id'],
+        'CaseNumber': record['CaseNumber'],
+        'AccountId': record['AccountId'],
+        'Account': {'Id': account['Id'], 'Name': account['Name']} if account else None,
+        'Status': record['Status'],
+        'Subject': record['Subject'],
+    }
+
+
 class CaseService:
     """Service for managing Salesforce Cases"""
     
-    def __init__(self):
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
     
+    @classmethod
+    def invalidate(cls, user_id: Optional[str] = None) -> None:
+        """Drop cached active cases for one user (or for everyone) after a Case owner/status change."""
+        with _active_cases_lock:
+            if user_id is None:
+                _active_cases_cache.clear()
+            else:
+                _active_cases_cache.pop(user_id, None)
+
     def get_active_cases_for_user(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get active cases assigned to a specific user"""
+        """
+        Get active cases assigned to a specific user.
+        Results are cached per user for ACTIVE_CASES_CACHE_TTL seconds; callers
+        must treat the returned list as read-only.
+        """
+        with _active_cases_lock:
+            cached = _active_cases_cache.get(user_id)
+            if cached is not None and cached[0] > time.monotonic():
+                _cache_stats["hits"] += 1
+                logger.debug("Active cases cache hit for user %s (%s)", user_id, _cache_stats)
+                return cached[1]
+            _cache_stats["misses"] += 1
+        logger.debug("Active cases cache miss for user %s (%s)", user_id, _cache_stats)
+
         try:
-            logger.info(f"Fetching active cases for user: {user_id}")
+            logger.info("Fetching active cases for user: %s", user_id)
             
-            query = """
-            SELECT Id, CaseNumber, AccountId, Account.Id, Account.Name,
-                   Contact.Id, Contact.Name, Status, Subject
-            FROM Case 
-            WHERE OwnerId = :userId 
-            AND Status IN ('New', 'Working', 'Escalated', 'In Progress', 'Active')
-            ORDER BY CreatedDate DESC
-            LIMIT 100
-            """
+            result = self.sf_client.query(_ACTIVE_CASES_SOQL, {"userId": user_id})
             
-            result = self.sf_client.query(query, {"userId": user_id})
+            cases = list(map(_map_case, result.get('records', [])))
             
-            cases = []
-            for record in result.get('records', []):
-                account = record.get('Account') or {}
-                cases.append({
-                    'Id': record.get('Id'),
-                    'CaseNumber': record.get('CaseNumber'),
-                    'AccountId': record.get('AccountId'),
-                    'Account': {
-                        'Id': account.get('Id'),
-                        'Name': account.get('Name')
-                    } if account else None,
-                    'Status': record.get('Status'),
-                    'Subject': record.get('Subject')
-                })
-            
-            logger.info(f"Found {len(cases)} active cases for user {user_id}")
+            logger.info("Found %s active cases for user %s", len(cases), user_id)
+
+            with _active_cases_lock:
+                if len(_active_cases_cache) >= ACTIVE_CASES_CACHE_SIZE:
+                    # Evict expired entries first, then the oldest if still full
+                    now = time.monotonic()
+                    for key in [k for k, (expires_at, _) in _active_cases_cache.items() if expires_at <= now]:
+                        del _active_cases_cache[key]
+                    if len(_active_cases_cache) >= ACTIVE_CASES_CACHE_SIZE:
+                        del _active_cases_cache[next(iter(_active_cases_cache))]
+                _active_cases_cache[user_id] = (time.monotonic() + ACTIVE_CASES_CACHE_TTL, cases)
             return cases
             
         except Exception as e:
-            logger.error(f"Failed to fetch cases for user {user_id}: {e}")
+            logger.error("Failed to fetch cases for user %s: %s", user_id, e)
             raise
@@ -1,22 +1,218 @@
 ﻿# server/app/salesforce/intake_service.py
+import asyncio
 import logging
 import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional, Tuple
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 
-from .sf_client import SalesforceClient
+from .sf_client import SalesforceClient, get_sf_client
 
 logger = logging.getLogger("intake_service")
 
+# Reverse-geocode results are cached per coordinate cell; 4 decimal places is ~11 m
+GEOCODE_PRECISION = 4
+GEOCODE_CACHE_SIZE = 4096
+GEOCODE_CACHE_TTL = 7 * 24 * 60 * 60
+
+NOMINATIM_REVERSE_URL = 'https://nominatim.openstreetmap.org/reverse'
+_GEOCODE_HEADERS = {'User-Agent': 'TGTHR-Intake/1.0 (contact@tgthr.org)'}
+
+# Per-phase HTTP timeouts for Nominatim; together they stay under GEOCODE_WAIT_SECONDS so
+# a dead geocoder fails the request (and trips the breaker) before an intake's wait expires
+GEOCODE_CONNECT_TIMEOUT = 3
+GEOCODE_READ_TIMEOUT = 5
+
+# Pooled connections to Nominatim, reused across intakes: the session serves
+# worker threads, the async client serves lookups made on the event loop
+_geocode_session = requests.Session()
+_geocode_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_geocode_async_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(GEOCODE_READ_TIMEOUT, connect=GEOCODE_CONNECT_TIMEOUT),
+    headers=_GEOCODE_HEADERS,
+    limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+)
+
+# {cell: (expires_at, address)} in LRU order - expires_at is on the time.monotonic() clock
+_geocode_cache: "OrderedDict[Tuple[float, float], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# Lookups in progress, so concurrent intakes in the same cell share one request
+_geocode_inflight: Dict[Tuple[float, float], Future] = {}
+_geocode_lock = threading.Lock()
+
+# Location normalization (and its reverse geocode) runs here while the intake payload is built
+_location_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="intake-geocode")
+# Longest an intake waits on the geocoder before sending its location without an address
+GEOCODE_WAIT_SECONDS = 9
+# After a geocode wait times out or a lookup fails, lookups are skipped for this long
+GEOCODE_BREAKER_SECONDS = 60
+# time.monotonic() until which reverse geocoding is skipped
+_geocode_paused_until = 0.0
+
+
+def _trip_geocode_breaker(reason: str) -> None:
+    """Skip reverse geocoding for GEOCODE_BREAKER_SECONDS so an unhealthy geocoder cannot slow intakes."""
+    global _geocode_paused_until
+    _geocode_paused_until = time.monotonic() + GEOCODE_BREAKER_SECONDS
+    logger.warning("Reverse geocoding %s; skipping lookups for %ss", reason, GEOCODE_BREAKER_SECONDS)
+
+
+def _claim_geocode(cell: Tuple[float, float]) -> Tuple[Optional[Dict[str, Any]], Optional[Future], bool]:
+    """
+    Return (cached address, None, False) on a cache hit. Otherwise return the
+    in-flight lookup for the cell and whether the caller started it (and so
+    must perform it and call _finish_geocode()).
+    """
+    with _geocode_lock:
+        cached = _geocode_cache.get(cell)
+        if cached is not None and cached[0] > time.monotonic():
+            _geocode_cache.move_to_end(cell)
+            return cached[1], None, False
+        pending = _geocode_inflight.get(cell)
+        if pending is not None:
+            return None, pending, False
+        pending = _geocode_inflight[cell] = Future()
+        # Mark it running so a cancelled waiter (asyncio.wrap_future propagates
+        # cancellation) cannot cancel the lookup shared by everyone else
+        pending.set_running_or_notify_cancel()
+        return None, pending, True
+
+
+def _finish_geocode(cell: Tuple[float, float], pending: Future, address: Optional[Dict[str, Any]]) -> None:
+    """Publish the result of a lookup started via _claim_geocode() to the cache and any waiters."""
+    with _geocode_lock:
+        del _geocode_inflight[cell]
+        if address:
+            # Only successful lookups are cached; failures are retried next intake
+            _geocode_cache[cell] = (time.monotonic() + GEOCODE_CACHE_TTL, address)
+            _geocode_cache.move_to_end(cell)
+            if len(_geocode_cache) > GEOCODE_CACHE_SIZE:
+                _geocode_cache.popitem(last=False)
+    if not pending.done():
+        pending.set_result(address)
+
+
+def _geocode_params(lat: float, lon: float) -> Dict[str, Any]:
+    return {
+        'format': 'jsonv2',
+        'lat': lat,
+        'lon': lon,
+        'zoom': 18,
+        'addressdetails': 1
+    }
+
+
+# Nominatim address keys, most specific first; the first non-empty one is used
+_ROAD_KEYS = ('road', 'pedestrian')
+_STREET_FALLBACK_KEYS = ('suburb', 'neighbourhood')
+_CITY_KEYS = ('city', 'town', 'village', 'hamlet', 'municipality')
+_STATE_KEYS = ('state', 'region')
+
+
+def _first_present(address: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    return next((address[key] for key in keys if address.get(key)), None)
+
+
+def _has_client_address(location: Dict[str, Any]) -> bool:
+    """True when the client already resolved the address, so no server-side lookup is needed."""
+    return isinstance(location.get('address'), dict) or bool(location.get('formattedAddress'))
+
+
+def _parse_geocode_response(response: Any) -> Optional[Dict[str, Any]]:
+    """Map a Nominatim reverse response (requests or httpx) onto the intake address shape."""
+    if response.status_code != 200:
+        logger.warning("Reverse geocode failed (HTTP %s): %s", response.status_code, response.text[:200])
+        _trip_geocode_breaker(f"returned HTTP {response.status_code}")
+        return None
+
+    data = response.json()
+    address = data.get('address') or {}
+
+    road = _first_present(address, _ROAD_KEYS)
+    house_number = address.get('house_number')
+    street = f"{house_number} {road}" if house_number and road else house_number or road
+
+    return {
+        'street': street or _first_present(address, _STREET_FALLBACK_KEYS),
+        'city': _first_present(address, _CITY_KEYS),
+        'state': _first_present(address, _STATE_KEYS),
+        'postalCode': address.get('postcode'),
+        'country': address.get('country'),
+        'formatted': data.get('display_name'),
+    }
+
+
+# Fields copied into the ProgramEnrollmentService ingestEncounter payload
+_ENCOUNTER_REQUIRED_FIELDS = (
+    "encounterUuid", "personUuid", "firstName", "lastName",
+    "startUtc", "endUtc", "pos", "isCrisis", "notes",
+    "deviceId", "createdBy", "createdByEmail",
+)
+_ENCOUNTER_OPTIONAL_FIELDS = ("email", "phone", "birthdate")
+
+# Completed intakes are remembered per encounterUuid so immediate client retries
+# get the first result instead of calling ProgramEnrollmentService again
+INTAKE_RESULT_TTL = 60
+INTAKE_RESULT_CACHE_SIZE = 256
+
+# {encounterUuid: (expires_at, result)} in insertion order - expires_at is on the time.monotonic() clock
+_intake_results: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# Intakes in progress, so duplicate submissions share one Salesforce call
+_intake_inflight: Dict[str, Future] = {}
+_intake_lock = threading.Lock()
+
+
+def _claim_intake(encounter_uuid: str) -> Tuple[Optional[Future], bool]:
+    """
+    Return the future for an intake already completed or in progress and False,
+    or a new future and True if the caller must process it and call _finish_intake().
+    """
+    with _intake_lock:
+        cached = _intake_results.get(encounter_uuid)
+        if cached is not None and cached[0] > time.monotonic():
+            done: Future = Future()
+            done.set_result(cached[1])
+            return done, False
+        pending = _intake_inflight.get(encounter_uuid)
+        if pending is not None:
+            return pending, False
+        pending = _intake_inflight[encounter_uuid] = Future()
+        return pending, True
+
+
+def _finish_intake(
+    encounter_uuid: str,
+    pending: Future,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Publish the outcome of an intake started via _claim_intake() to the cache and any waiters."""
+    with _intake_lock:
+        del _intake_inflight[encounter_uuid]
+        if error is None:
+            # Only successful intakes are remembered; failures may be retried
+            _intake_results[encounter_uuid] = (time.monotonic() + INTAKE_RESULT_TTL, result)
+            if len(_intake_results) > INTAKE_RESULT_CACHE_SIZE:
+                _intake_results.popitem(last=False)
+    if error is None:
+        pending.set_result(result)
+    else:
+        pending.set_exception(error)
+
+
 class IntakeService:
     """Service for processing comprehensive new client intakes"""
     
-    def __init__(self):
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
     
-    def _reverse_geocode(self, location: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Attempt to resolve a latitude/longitude pair into a street address."""
+    def _geocode_cell(self, location: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Cache cell for the location's coordinates, or None if it should not be geocoded."""
         latitude = location.get('latitude')
         longitude = location.get('longitude')
 
@@ -24,60 +220,101 @@ class IntakeService:
             lat = float(latitude) if latitude is not None else None
             lon = float(longitude) if longitude is not None else None
         except (TypeError, ValueError):
-            logger.warning(f"Invalid coordinates supplied for reverse geocoding: {latitude}, {longitude}")
+            logger.warning("Invalid coordinates supplied for reverse geocoding: %s, %s", latitude, longitude)
             return None
 
         if lat is None or lon is None:
             return None
 
+        if time.monotonic() < _geocode_paused_until:
+            return None
+
+        return (round(lat, GEOCODE_PRECISION), round(lon, GEOCODE_PRECISION))
+
+    def _reverse_geocode(self, location: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Attempt to resolve a latitude/longitude pair into a street address."""
+        cell = self._geocode_cell(location)
+        if cell is None:
+            return None
+
+        cached, pending, owner = _claim_geocode(cell)
+        if cached is not None:
+            return dict(cached)
+        if not owner:
+            address = pending.result()
+            return dict(address) if address else None
+
+        address = None
         try:
-            response = requests.get(
-                'https://nominatim.openstreetmap.org/reverse',
-                params={
-                    'format': 'jsonv2',
-                    'lat': lat,
-                    'lon': lon,
-                    'zoom': 18,
-                    'addressdetails': 1
-                },
-                headers={'User-Agent': 'TGTHR-Intake/1.0 (contact@tgthr.org)'},
-                timeout=8
-            )
-            if response.status_code != 200:
-                logger.warning(f"Reverse geocode failed (HTTP {response.status_code}): {response.text[:200]}")
-                return None
-
-            data = response.json()
-            address = data.get('address') or {}
-
-            street_parts = [
-                address.get('house_number'),
-                address.get('road') or address.get('pedestrian'),
-            ]
-            street = " ".join([part for part in street_parts if part])
-
-            city = (
-                address.get('city')
-                or address.get('town')
-                or address.get('village')
-                or address.get('hamlet')
-                or address.get('municipality')
+            address = self._fetch_address(*cell)
+        finally:
+            _finish_geocode(cell, pending, address)
+        return dict(address) if address else None
+
+    async def _reverse_geocode_async(self, location: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """_reverse_geocode() for the event loop; shares its cache and in-flight lookups."""
+        cell = self._geocode_cell(location)
+        if cell is None:
+            return None
+
+        cached, pending, owner = _claim_geocode(cell)
+        if cached is not None:
+            return dict(cached)
+        if not owner:
+            # Shielded so cancelling this waiter leaves the shared lookup alone
+            address = await asyncio.shield(asyncio.wrap_future(pending))
+            return dict(address) if address else None
+
+        address = None
+        try:
+            address = await self._fetch_address_async(*cell)
+        finally:
+            _finish_geocode(cell, pending, address)
+        return dict(address) if address else None
+
+    async def resolve_location_address(self, location: Any) -> Any:
+        """
+        Return ``location`` with its street address resolved on the event loop,
+        so process_full_intake() can skip the blocking lookup. The input is not
+        modified; locations that already carry an address are returned as-is.
+        """
+        if not isinstance(location, dict) or _has_client_address(location):
+            return location
+        address = await self._reverse_geocode_async(location)
+        if not address:
+            return location
+        return {**location, 'address': address}
+
+    def _fetch_address(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Look up the street address for a coordinate pair on Nominatim."""
+        try:
+            response = _geocode_session.get(
+                NOMINATIM_REVERSE_URL,
+                params=_geocode_params(lat, lon),
+                headers=_GEOCODE_HEADERS,
+                timeout=(GEOCODE_CONNECT_TIMEOUT, GEOCODE_READ_TIMEOUT)
             )
+            return _parse_geocode_response(response)
+        except Exception as exc:
+            logger.warning("Reverse geocoding exception: %s", exc)
+            _trip_geocode_breaker("failed")
+            return None
 
-            return {
-                'street': street or address.get('suburb') or address.get('neighbourhood'),
-                'city': city,
-                'state': address.get('state') or address.get('region'),
-                'postalCode': address.get('postcode'),
-                'country': address.get('country'),
-                'formatted': data.get('display_name'),
-            }
+    async def _fetch_address_async(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """_fetch_address() over the shared async client."""
+        try:
+            response = await _geocode_async_client.get(
+                NOMINATIM_REVERSE_URL,
+                params=_geocode_params(lat, lon),
+            )
+            return _parse_geocode_response(response)
         except Exception as exc:
-            logger.warning(f"Reverse geocoding exception: {exc}")
+            logger.warning("Reverse geocoding exception: %s", exc)
+            _trip_geocode_breaker("failed")
             return None
 
-    def _normalize_location(self, location: Any) -> Optional[Dict[str, Any]]:
-        """Normalize location payload from the client and enrich with address data."""
+    def _normalize_location(self, location: Any, resolve_address: bool = True) -> Optional[Dict[str, Any]]:
+        """Normalize location payload from the client and enrich bare coordinates with address data."""
         if not isinstance(location, dict):
             return None
 
@@ -92,48 +329,70 @@ class IntakeService:
             'source': location.get('source') or 'device',
         }
 
-        # Carry through any address information we already have or attempt to resolve it.
+        # Carry through any address information the client already resolved; the
+        # reverse geocode only runs for bare coordinates.
         address = location.get('address')
+        formatted = location.get('formattedAddress')
         if isinstance(address, dict):
             normalized['address'] = address
-        else:
+        elif formatted:
+            normalized['address'] = {'formatted': formatted}
+        elif resolve_address:
             resolved = self._reverse_geocode(normalized)
             if resolved:
                 normalized['address'] = resolved
 
-        # Provide formatted fallback if supplied by the client.
-        formatted = location.get('formattedAddress')
-        if formatted and 'address' not in normalized:
-            normalized['address'] = {'formatted': formatted}
-
         return normalized
 
-    def process_full_intake(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Process complete new client intake workflow"""
+    def _await_location(self, location_future: Future, location: Any) -> Optional[Dict[str, Any]]:
+        """
+        Wait up to GEOCODE_WAIT_SECONDS for the normalized location. On timeout the
+        location is sent without a resolved address and geocoding is paused for
+        GEOCODE_BREAKER_SECONDS so a slow geocoder cannot back up intakes.
+        """
         try:
-            logger.info(f"Processing full intake for person: {payload['personUuid']}")
+            return location_future.result(timeout=GEOCODE_WAIT_SECONDS)
+        except FutureTimeoutError:
+            _trip_geocode_breaker(f"exceeded {GEOCODE_WAIT_SECONDS}s")
+            return self._normalize_location(location, resolve_address=False)
 
-            location_payload = self._normalize_location(payload.get('location'))
-            
-            # Call the existing ProgramEnrollmentService.ingestEncounter with enhanced data
-            encounter_data: Dict[str, Any] = {
-                "encounterUuid": payload['encounterUuid'],
-                "personUuid": payload['personUuid'],
-                "firstName": payload['firstName'],
-                "lastName": payload['lastName'],
-                "startUtc": payload['startUtc'],
-                "endUtc": payload['endUtc'],
-                "pos": payload['pos'],
-                "isCrisis": payload['isCrisis'],
-                "notes": payload['notes'],
-                "email": payload.get('email'),
-                "phone": payload.get('phone'),
-                "birthdate": payload.get('birthdate'),
-                "deviceId": payload['deviceId'],
-                "createdBy": payload['createdBy'],
-                "createdByEmail": payload['createdByEmail'],
-            }
+    def process_full_intake(self, payload: Dict[str, Any], resolve_address: bool = True) -> Dict[str, Any]:
+        """
+        Process complete new client intake workflow. Concurrent or repeated
+        submissions of the same encounterUuid share one Salesforce call.
+        Pass resolve_address=False when the reverse geocode was already attempted.
+        """
+        encounter_uuid = payload.get('encounterUuid')
+        if not encounter_uuid:
+            return self._process_full_intake(payload, resolve_address)
+
+        pending, owner = _claim_intake(encounter_uuid)
+        if not owner:
+            logger.info("Intake %s already submitted; sharing its result", encounter_uuid)
+            return pending.result()
+        try:
+            result = self._process_full_intake(payload, resolve_address)
+        except BaseException as e:
+            _finish_intake(encounter_uuid, pending, error=e)
+            raise
+        _finish_intake(encounter_uuid, pending, result)
+        return result
+
+    def _process_full_intake(self, payload: Dict[str, Any], resolve_address: bool = True) -> Dict[str, Any]:
+        try:
+            logger.info("Processing full intake for person: %s", payload['personUuid'])
 
+            # Required fields raise KeyError here, before any geocoding or Salesforce work
+            encounter_data: Dict[str, Any] = {key: payload[key] for key in _ENCOUNTER_REQUIRED_FIELDS}
+            encounter_data.update((key, payload.get(key)) for key in _ENCOUNTER_OPTIONAL_FIELDS)
+
+            location = payload.get('location')
+            if resolve_address:
+                # Geocode in the background while the rest of the payload is prepared
+                location_future = _location_executor.submit(self._normalize_location, location)
+                location_payload = self._await_location(location_future, location)
+            else:
+                location_payload = self._normalize_location(location, resolve_address=False)
             if location_payload:
                 encounter_data["location"] = location_payload
             logger.info(
@@ -143,16 +402,17 @@ class IntakeService:
                 bool(encounter_data.get("location")),
                 encounter_data.get("createdBy"),
             )
-            try:
-                logger.debug(
-                    "ProgramEnrollmentService payload body: %s",
-                    json.dumps(encounter_data, default=str, sort_keys=True),
-                )
-            except TypeError as serialization_error:
-                logger.debug(
-                    "ProgramEnrollmentService payload serialization failed: %s",
-                    serialization_error,
-                )
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    logger.debug(
+                        "ProgramEnrollmentService payload body: %s",
+                        json.dumps(encounter_data, default=str, sort_keys=True),
+                    )
+                except TypeError as serialization_error:
+                    logger.debug(
+                        "ProgramEnrollmentService payload serialization failed: %s",
+                        serialization_error,
+                    )
             
             # Make REST call to enhanced ProgramEnrollmentService
             response = self.sf_client.call_apex_rest(
@@ -161,7 +421,8 @@ class IntakeService:
             )
             
             if response.get('success'):
-                logger.info(f"Successfully processed intake: {response}")
+                logger.info("Successfully processed intake %s", encounter_data["encounterUuid"])
+                logger.debug("ProgramEnrollmentService response: %s", response)
                 return {
                     'personAccountId': response.get('accountId'),
                     'programEnrollmentId': response.get('enrollmentId'),
@@ -173,7 +434,7 @@ class IntakeService:
                 raise Exception(f"Salesforce processing failed: {response}")
                 
         except Exception as e:
-            logger.error(f"Failed to process full intake: {e}")
+            logger.error("Failed to process full intake: %s", e)
             raise
 
 def process_full_intake(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -181,3 +442,25 @@ def process_full_intake(payload: Dict[str, Any]) -> Dict[str, Any]:
     service = IntakeService()
     return service.process_full_intake(payload)
 
+
+async def process_full_intake_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    process_full_intake() for async routes: the reverse geocode runs on the
+    event loop and the Salesforce calls run in a worker thread.
+    """
+    service = IntakeService()
+    location = payload.get('location')
+    try:
+        # Same cap and breaker as the thread path's _await_location()
+        location = await asyncio.wait_for(service.resolve_location_address(location), GEOCODE_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        _trip_geocode_breaker(f"exceeded {GEOCODE_WAIT_SECONDS}s")
+    if location is not payload.get('location'):
+        payload = {**payload, 'location': location}
+    # The lookup was attempted above; a failed or timed-out one is not retried in the thread
+    return await asyncio.to_thread(service.process_full_intake, payload, False)
+
+
+async def close_geocode_client() -> None:
+    """Close the shared async Nominatim client (call on app shutdown)."""
+    await _geocode_async_client.aclose()
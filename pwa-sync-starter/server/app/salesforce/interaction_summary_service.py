@@ -1,21 +1,104 @@
 # server/app/salesforce/interaction_summary_service.py
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
-from .sf_client import SalesforceClient
+from .sf_client import SalesforceClient, get_sf_client, sf_id18
 
 logger = logging.getLogger("interaction_summary_service")
 
+# User names change rarely; cached ids skip the User lookup for this long
+USER_NAME_CACHE_TTL = 60 * 60
+
+# {user_id: (expires_at, name)} - expires_at is on the time.monotonic() clock
+_user_names: Dict[str, Tuple[float, str]] = {}
+_user_names_lock = threading.Lock()
+
+# Fixed query text; only the id list and optional LIMIT are substituted per call
+_INTERACTIONS_SOQL = (
+    "SELECT Id, Name, RelatedRecordId, Date_of_Interaction__c, "
+    "AccountId, InteractionPurpose, Status, "
+    "Start_Time__c, End_Time__c, MeetingNotes, "
+    "CreatedDate, LastModifiedDate, "
+    "CreatedById, "
+    "Interview__c, "
+    "Interview__r.InterviewTemplateVersion__r.InterviewTemplate__r.Name, "
+    "Action_Required__c, Action_Assigned_To__c, "
+    "Requires_Manager_Approval__c, Manager_Signed__c, "
+    "Manager_Rejected__c, Manager_Approver__c "
+    "FROM InteractionSummary "
+    "WHERE RelatedRecordId IN (%s) "
+    "ORDER BY Date_of_Interaction__c DESC, CreatedDate DESC%s"
+)
+
+_INTERACTION_DETAIL_SOQL = (
+    "SELECT Id, Name, RelatedRecordId, Date_of_Interaction__c, "
+    "AccountId, InteractionPurpose, Status, "
+    "Start_Time__c, End_Time__c, MeetingNotes, "
+    "Description_of_Services__c, Response_and_Progress__c, "
+    "Plan__c, POS__c, Interpreter_Used__c, "
+    "CreatedDate, LastModifiedDate, "
+    "CreatedBy.Name, "
+    "Interview__c, "
+    "Action_Required__c, Action_Assigned_To__c, "
+    "Requires_Manager_Approval__c, Manager_Signed__c, "
+    "Manager_Rejected__c, Manager_Approver__c "
+    "FROM InteractionSummary "
+    "WHERE Id = :interactionId "
+    "LIMIT 1"
+)
+
+_INTERVIEW_ANSWERS_SOQL = (
+    "SELECT Id, Section__c, Question_API_Name__c, "
+    "Response_Text__c, Response_Number__c, Response_Boolean__c, "
+    "Response_Picklist__c, Response_Date__c, "
+    "InterviewQuestion__r.Label__c, InterviewQuestion__r.Section__c, "
+    "InterviewQuestion__r.Order__c, InterviewQuestion__r.Response_Type__c "
+    "FROM InterviewAnswer__c "
+    "WHERE Interview__c = :interviewId "
+    "ORDER BY InterviewQuestion__r.Section__c, InterviewQuestion__r.Order__c"
+)
+
+def _map_interaction(record: Dict[str, Any], creator_names: Dict[str, str]) -> Dict[str, Any]:
+    """Map an InteractionSummary record to the timeline row shape returned to the PWA"""
+    return {
+        'Id': record.get('Id'),
+        'Name': record.get('Name'),
+        'RelatedRecordId': record.get('RelatedRecordId'),
+        'AccountId': record.get('AccountId'),
+        'InteractionPurpose': record.get('InteractionPurpose'),
+        'Status': record.get('Status'),
+        'InteractionDate': record.get('Date_of_Interaction__c'),
+        'StartTime': record.get('Start_Time__c'),
+        'EndTime': record.get('End_Time__c'),
+        'Notes': record.get('MeetingNotes'),
+        'NoteType': record.get('InteractionPurpose'),
+        'CreatedByName': creator_names.get(record.get('CreatedById')) or 'Unknown',
+        'CreatedDate': record.get('CreatedDate'),
+        'LastModifiedDate': record.get('LastModifiedDate'),
+        'InterviewId': record.get('Interview__c'),
+        'InterviewTemplateName': ((record.get('Interview__r') or {}).get('InterviewTemplateVersion__r') or {}).get('InterviewTemplate__r', {}).get('Name'),
+        'ActionRequired': record.get('Action_Required__c'),
+        'ActionAssignedTo': record.get('Action_Assigned_To__c'),
+        'RequiresManagerApproval': record.get('Requires_Manager_Approval__c', False),
+        'ManagerSigned': record.get('Manager_Signed__c', False),
+        'ManagerRejected': record.get('Manager_Rejected__c', False),
+        'ManagerApprover': record.get('Manager_Approver__c'),
+    }
+
+
 class InteractionSummaryService:
     """Service for managing InteractionSummary records"""
     
-    def __init__(self):
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
     
     def create_interaction_summary(self, data: Dict[str, Any]) -> str:
         """Create an InteractionSummary record in Salesforce"""
         try:
-            logger.info(f"Creating interaction summary for case: {data.get('RelatedRecordId')}")
+            logger.info("Creating interaction summary for case: %s", data.get('RelatedRecordId'))
 
             # Create the interaction summary record using the existing sf_client method
             from .sf_client import call_interaction_summary_service
@@ -29,7 +112,7 @@ class InteractionSummaryService:
                 start_time=data.get('StartTime'),
                 end_time=data.get('EndTime'),
                 interaction_purpose=self._normalize_note_type(data.get('NoteType')),
-                uuid=f"interaction_{datetime.now().isoformat()}",
+                uuid=f"interaction_{uuid.uuid4().hex}",
                 created_by_user_id=data.get('CreatedBy') or ''
             )
 
@@ -42,82 +125,107 @@ class InteractionSummaryService:
                     interaction_id
                 )
             
-            logger.info(f"Successfully created interaction summary: {interaction_id}")
+            logger.info("Successfully created interaction summary: %s", interaction_id)
             return interaction_id
                 
         except Exception as e:
-            logger.error(f"Failed to create interaction summary: {e}")
+            logger.error("Failed to create interaction summary: %s", e)
             raise
     
     def get_interactions_by_record(self, record_id: str, max_rows: int = 50) -> List[Dict[str, Any]]:
         """Fetch interaction summaries for a specific record (Case, Account, etc.)"""
+        return self.get_interactions_by_records([record_id], max_rows).get(record_id, [])
+
+    def get_interactions_by_records(
+        self, record_ids: List[str], max_rows_per: int = 50
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch interaction summaries for several records in one query, keyed by record id"""
+        interactions: Dict[str, List[Dict[str, Any]]] = {record_id: [] for record_id in record_ids}
+        # Salesforce ids are alphanumeric; anything else is skipped rather than quoted into SOQL.
+        # Results carry 18-character ids, so 15-character ids are matched on their 18-character form
+        buckets: Dict[str, List[Dict[str, Any]]] = {}
+        for record_id in interactions:
+            if record_id and record_id.isalnum():
+                buckets.setdefault(sf_id18(record_id), [])
+        ids = list(buckets)
+        if not ids:
+            return interactions
+
         try:
-            logger.info(f"Fetching interactions for record: {record_id} (type: {type(record_id).__name__})")
-            
-            query = """
-            SELECT Id, Name, RelatedRecordId, Date_of_Interaction__c, 
-                   AccountId, InteractionPurpose, Status,
-                   Start_Time__c, End_Time__c, MeetingNotes,
-                   CreatedDate, LastModifiedDate,
-                   CreatedBy.Name,
-                   Interview__c,
-                   Interview__r.InterviewTemplateVersion__r.InterviewTemplate__r.Name,
-                   Action_Required__c, Action_Assigned_To__c,
-                   Requires_Manager_Approval__c, Manager_Signed__c,
-                   Manager_Rejected__c, Manager_Approver__c
-            FROM InteractionSummary
-            WHERE RelatedRecordId = :recordId
-            ORDER BY Date_of_Interaction__c DESC, CreatedDate DESC
-            LIMIT :maxRows
-            """
-            
-            logger.debug(f"Query: {query}")
-            logger.debug(f"Parameters: recordId={record_id}, maxRows={max_rows}")
-            
-            result = self.sf_client.query(query, {
-                "recordId": record_id,
-                "maxRows": max_rows
-            })
-            
-            logger.debug(f"Query result: {result}")
-            
-            interactions = []
-            for record in result.get('records', []):
-                interaction = {
-                    'Id': record.get('Id'),
-                    'Name': record.get('Name'),
-                    'RelatedRecordId': record.get('RelatedRecordId'),
-                    'AccountId': record.get('AccountId'),
-                    'InteractionPurpose': record.get('InteractionPurpose'),
-                    'Status': record.get('Status'),
-                    'InteractionDate': record.get('Date_of_Interaction__c'),
-                    'StartTime': record.get('Start_Time__c'),
-                    'EndTime': record.get('End_Time__c'),
-                    'Notes': record.get('MeetingNotes'),
-                    'NoteType': record.get('InteractionPurpose'),
-                    'CreatedByName': record.get('CreatedBy', {}).get('Name') if record.get('CreatedBy') else 'Unknown',
-                    'CreatedDate': record.get('CreatedDate'),
-                    'LastModifiedDate': record.get('LastModifiedDate'),
-                    'InterviewId': record.get('Interview__c'),
-                    'InterviewTemplateName': ((record.get('Interview__r') or {}).get('InterviewTemplateVersion__r') or {}).get('InterviewTemplate__r', {}).get('Name'),
-                    'ActionRequired': record.get('Action_Required__c'),
-                    'ActionAssignedTo': record.get('Action_Assigned_To__c'),
-                    'RequiresManagerApproval': record.get('Requires_Manager_Approval__c', False),
-                    'ManagerSigned': record.get('Manager_Signed__c', False),
-                    'ManagerRejected': record.get('Manager_Rejected__c', False),
-                    'ManagerApprover': record.get('Manager_Approver__c'),
-                }
-                logger.debug(f"Mapped interaction: {interaction}")
-                interactions.append(interaction)
-            
-            logger.info(f"Found {len(interactions)} interactions for record {record_id}")
+            logger.info("Fetching interactions for %s records", len(ids))
+
+            id_list = ", ".join(f"'{record_id}'" for record_id in ids)
+            # LIMIT is global in SOQL, so it only applies when a single record is requested;
+            # otherwise every page is read and each bucket is capped below
+            limit = f" LIMIT {max_rows_per}" if len(ids) == 1 else ""
+            query = _INTERACTIONS_SOQL % (id_list, limit)
+
+            logger.debug("Query: %s", query)
+
+            row_count = 0
+            for record in self.sf_client.iter_query(query):
+                row_count += 1
+                bucket = buckets.get(record.get('RelatedRecordId'))
+                if bucket is not None and len(bucket) < max_rows_per:
+                    bucket.append(record)
+
+            creator_names = self._get_user_names(
+                record.get('CreatedById') for bucket in buckets.values() for record in bucket
+            )
+            mapped = {
+                record_id: [_map_interaction(record, creator_names) for record in bucket]
+                for record_id, bucket in buckets.items()
+            }
+            for record_id in interactions:
+                if record_id and record_id.isalnum():
+                    interactions[record_id] = mapped[sf_id18(record_id)]
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Mapped interactions: %r", interactions)
+            logger.info("Found %s interactions for %s records", row_count, len(ids))
             return interactions
-                
+
         except Exception as e:
-            logger.error(f"Failed to fetch interactions for record {record_id}: {e}", exc_info=True)
-            # Return empty list instead of raising to prevent breaking the UI
-            logger.warning(f"Returning empty interaction list due to error")
-            return []
+            logger.error("Failed to fetch interactions for records %s: %s", ids, e, exc_info=True)
+            # Return empty lists instead of raising to prevent breaking the UI
+            logger.warning("Returning empty interaction list due to error")
+            return {record_id: [] for record_id in record_ids}
+
+    def _get_user_names(self, user_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Resolve User ids to names, querying only ids missing from the process-wide cache."""
+        names: Dict[str, str] = {}
+        missing = set()
+        now = time.monotonic()
+        with _user_names_lock:
+            for user_id in user_ids:
+                if not user_id or user_id in names:
+                    continue
+                cached = _user_names.get(user_id)
+                if cached is not None and cached[0] > now:
+                    names[user_id] = cached[1]
+                else:
+                    missing.add(user_id)
+
+        # Salesforce ids are alphanumeric; anything else is skipped rather than quoted into SOQL
+        missing = [user_id for user_id in missing if user_id.isalnum()]
+        if not missing:
+            return names
+
+        try:
+            id_list = ", ".join(f"'{user_id}'" for user_id in missing)
+            result = self.sf_client.query(f"SELECT Id, Name FROM User WHERE Id IN ({id_list})")
+        except Exception as e:
+            logger.warning("Could not resolve user names for %s users: %s", len(missing), e)
+            return names
+
+        expires_at = time.monotonic() + USER_NAME_CACHE_TTL
+        with _user_names_lock:
+            for user in result.get('records', []):
+                name = user.get('Name')
+                if name:
+                    names[user['Id']] = name
+                    _user_names[user['Id']] = (expires_at, name)
+        return names
 
     def _normalize_note_type(self, note_type: Any) -> str:
         normalized = str(note_type or '').strip().lower()
@@ -132,26 +240,9 @@ class InteractionSummaryService:
     def get_interaction_detail(self, interaction_id: str, current_user_id: str = None) -> Dict[str, Any]:
         """Fetch a single InteractionSummary with hydrated related records."""
         try:
-            logger.info(f"Fetching interaction detail: {interaction_id}")
-
-            query = """
-            SELECT Id, Name, RelatedRecordId, Date_of_Interaction__c,
-                   AccountId, InteractionPurpose, Status,
-                   Start_Time__c, End_Time__c, MeetingNotes,
-                   Description_of_Services__c, Response_and_Progress__c,
-                   Plan__c, POS__c, Interpreter_Used__c,
-                   CreatedDate, LastModifiedDate,
-                   CreatedBy.Name,
-                   Interview__c,
-                   Action_Required__c, Action_Assigned_To__c,
-                   Requires_Manager_Approval__c, Manager_Signed__c,
-                   Manager_Rejected__c, Manager_Approver__c
-            FROM InteractionSummary
-            WHERE Id = :interactionId
-            LIMIT 1
-            """
-
-            result = self.sf_client.query(query, {"interactionId": interaction_id})
+            logger.info("Fetching interaction detail: %s", interaction_id)
+
+            result = self.sf_client.query(_INTERACTION_DETAIL_SOQL, {"interactionId": interaction_id})
             records = result.get('records', [])
             if not records:
                 return None
@@ -187,7 +278,7 @@ class InteractionSummaryService:
                         tmpl = ver.get('InterviewTemplate__r') or {}
                         interview_template_name = tmpl.get('Name')
                 except Exception as e:
-                    logger.warning(f"Could not hydrate interview {interview_id}: {e}")
+                    logger.warning("Could not hydrate interview %s: %s", interview_id, e)
 
             case_id = rec.get('RelatedRecordId')
 
@@ -269,7 +360,7 @@ class InteractionSummaryService:
 
             return detail
         except Exception as e:
-            logger.error(f"Failed to fetch interaction detail {interaction_id}: {e}", exc_info=True)
+            logger.error("Failed to fetch interaction detail %s: %s", interaction_id, e, exc_info=True)
             raise
 
     # ── Related record hydration helpers ──────────────────────────────
@@ -277,17 +368,7 @@ class InteractionSummaryService:
     def _fetch_interview_answers(self, interview_id: str) -> List[Dict[str, Any]]:
         """Fetch InterviewAnswer__c records with question labels, grouped by section."""
         try:
-            query = (
-                "SELECT Id, Section__c, Question_API_Name__c, "
-                "Response_Text__c, Response_Number__c, Response_Boolean__c, "
-                "Response_Picklist__c, Response_Date__c, "
-                "InterviewQuestion__r.Label__c, InterviewQuestion__r.Section__c, "
-                "InterviewQuestion__r.Order__c, InterviewQuestion__r.Response_Type__c "
-                "FROM InterviewAnswer__c "
-                "WHERE Interview__c = :interviewId "
-                "ORDER BY InterviewQuestion__r.Section__c, InterviewQuestion__r.Order__c"
-            )
-            result = self.sf_client.query(query, {"interviewId": interview_id})
+            result = self.sf_client.query(_INTERVIEW_ANSWERS_SOQL, {"interviewId": interview_id})
             answers = []
             for r in result.get('records', []):
                 q = r.get('InterviewQuestion__r') or {}
@@ -309,7 +390,7 @@ class InteractionSummaryService:
                 })
             return answers
         except Exception as e:
-            logger.warning(f"Could not fetch interview answers for {interview_id}: {e}")
+            logger.warning("Could not fetch interview answers for %s: %s", interview_id, e)
             return []
 
     def _fetch_goals(self, interaction_id: str) -> List[Dict[str, Any]]:
@@ -340,7 +421,7 @@ class InteractionSummaryService:
                 for r in result.get('records', [])
             ]
         except Exception as e:
-            logger.warning(f"Could not fetch goals for interaction {interaction_id}: {e}")
+            logger.warning("Could not fetch goals for interaction %s: %s", interaction_id, e)
             return []
 
     def _fetch_services(self, interaction_id: str) -> List[Dict[str, Any]]:
@@ -365,7 +446,7 @@ class InteractionSummaryService:
                 for r in result.get('records', [])
             ]
         except Exception as e:
-            logger.warning(f"Could not fetch services for interaction {interaction_id}: {e}")
+            logger.warning("Could not fetch services for interaction %s: %s", interaction_id, e)
             return []
 
     def _fetch_diagnoses(self, interaction_id: str) -> List[Dict[str, Any]]:
@@ -395,7 +476,7 @@ class InteractionSummaryService:
                 for r in result.get('records', [])
             ]
         except Exception as e:
-            logger.warning(f"Could not fetch diagnoses for interaction {interaction_id}: {e}")
+            logger.warning("Could not fetch diagnoses for interaction %s: %s", interaction_id, e)
             return []
 
     def _fetch_service_lines(self, interaction_id: str) -> List[Dict[str, Any]]:
@@ -423,7 +504,7 @@ class InteractionSummaryService:
                 for r in result.get('records', [])
             ]
         except Exception as e:
-            logger.warning(f"Could not fetch service lines for interaction {interaction_id}: {e}")
+            logger.warning("Could not fetch service lines for interaction %s: %s", interaction_id, e)
             return []
 
     def _fetch_assessments(self, interaction_id: str) -> List[Dict[str, Any]]:
@@ -452,7 +533,7 @@ class InteractionSummaryService:
                 for r in result.get('records', [])
             ]
         except Exception as e:
-            logger.warning(f"Could not fetch assessments for interaction {interaction_id}: {e}")
+            logger.warning("Could not fetch assessments for interaction %s: %s", interaction_id, e)
             return []
 
     # ── Manager approval ──────────────────────────────────────────────
@@ -477,10 +558,11 @@ class InteractionSummaryService:
             if rec.get('Manager_Signed__c'):
                 return {'success': True, 'message': 'Already signed'}
 
-            # Update the InteractionSummary
+            # Update the InteractionSummary (and any linked Interview) with one signing time
+            signed_at = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.000+0000')
             update_data = {
                 'Manager_Signed__c': True,
-                'Manager_Signed_Date__c': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
+                'Manager_Signed_Date__c': signed_at,
             }
             self.sf_client.update('InteractionSummary', interaction_id, update_data)
 
@@ -488,27 +570,24 @@ class InteractionSummaryService:
             interview_id = rec.get('Interview__c')
             if interview_id:
                 try:
-                    self.sf_client.update('Interview__c', interview_id, {
-                        'Manager_Signed__c': True,
-                        'Manager_Signed_Date__c': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
-                    })
+                    self.sf_client.update('Interview__c', interview_id, update_data)
                 except Exception as e:
-                    logger.warning(f"Could not update Interview__c {interview_id} manager signature: {e}")
+                    logger.warning("Could not update Interview__c %s manager signature: %s", interview_id, e)
 
             # Upload signature image if provided
             if signature_data_url:
                 try:
                     self._upload_signature_content(interaction_id, user_id, signature_data_url)
                 except Exception as e:
-                    logger.warning(f"Could not upload signature image: {e}")
+                    logger.warning("Could not upload signature image: %s", e)
 
-            logger.info(f"Manager {user_id} approved interaction {interaction_id}")
+            logger.info("Manager %s approved interaction %s", user_id, interaction_id)
             return {'success': True, 'message': 'Manager approval recorded'}
 
         except (ValueError, PermissionError) as e:
             raise
         except Exception as e:
-            logger.error(f"Manager approve failed for {interaction_id}: {e}", exc_info=True)
+            logger.error("Manager approve failed for %s: %s", interaction_id, e, exc_info=True)
             raise
 
     def _upload_signature_content(self, record_id: str, user_id: str, data_url: str):
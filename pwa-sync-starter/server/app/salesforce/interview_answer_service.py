@@ -1,4 +1,5 @@
 # server/app/salesforce/interview_answer_service.py
+import atexit
 import logging
 from datetime import date, datetime, timezone
 from typing import Dict, Any, Optional
@@ -7,11 +8,16 @@ from uuid import uuid4
 import httpx
 
 from ..settings import settings
-from .sf_client import _sf, _api, _query, _get_token, call_interaction_summary_service
+from .sf_client import _sf, _api, _query, _get_token, call_interaction_summary_service, get_sf_client, SFCompositeError
 from .assessment_service import AssessmentServiceClient
 
 logger = logging.getLogger("interview_answer_service")
 
+# Pooled keep-alive connections to the docgen service, reused across interviews
+_docgen_http = httpx.Client(timeout=120.0, headers={'Connection': 'keep-alive'})
+atexit.register(_docgen_http.close)
+
+
 class InterviewAnswerService:
     """Service for managing Interview Answers"""
 
@@ -38,7 +44,7 @@ class InterviewAnswerService:
             Dictionary with success status and interview/answer record IDs
         """
         try:
-            logger.info(f"Saving interview answers for case {case_id} and template {template_version_id}")
+            logger.info("Saving interview answers for case %s and template %s", case_id, template_version_id)
             
             if not case_id or not template_version_id or not answers:
                 raise ValueError("case_id, template_version_id, and answers are all required")
@@ -80,14 +86,14 @@ class InterviewAnswerService:
                 interaction_summary_id
             )
             
-            logger.debug(f"Creating Interview header: {interview_data}")
+            logger.debug("Creating Interview header: %s", interview_data)
             interview_result = _sf(_api("/sobjects/Interview__c/"), method="POST", json=interview_data)
             
             if not interview_result or 'id' not in interview_result:
                 raise Exception(f"Failed to create Interview record: {interview_result}")
             
             interview_id = interview_result['id']
-            logger.info(f"Created Interview record: {interview_id}")
+            logger.info("Created Interview record: %s", interview_id)
 
             assessment_service = AssessmentServiceClient()
 
@@ -99,14 +105,14 @@ class InterviewAnswerService:
                 assessment_service.link_assessment_to_interaction(ssrs_assessment_id, interaction_summary_id)
                 assessment_service.link_assessment_to_interview(ssrs_assessment_id, interview_id)
             
-            # Now create InterviewAnswer__c records for each answer
-            answer_count = 0
+            # Build InterviewAnswer__c records for each answer, then create them together
+            answer_records: list[Dict[str, Any]] = []
             assessment_updates: Dict[str, Any] = {}
             for question_id, answer_value in answers.items():
                 try:
                     question = questions_by_id.get(question_id)
                     if not question:
-                        logger.warning(f"Question metadata not found for question {question_id}; skipping")
+                        logger.warning("Question metadata not found for question %s; skipping", question_id)
                         continue
 
                     answer_record = {
@@ -122,14 +128,7 @@ class InterviewAnswerService:
 
                     normalized_answer_value = self._normalize_answer_value(answer_value)
                     self._assign_answer_value(answer_record, question.get('Response_Type__c'), normalized_answer_value)
-                    
-                    logger.debug(f"Creating InterviewAnswer: {answer_record}")
-                    answer_result = _sf(_api("/sobjects/InterviewAnswer__c/"), method="POST", json=answer_record)
-                    
-                    if answer_result and 'id' in answer_result:
-                        answer_count += 1
-                    else:
-                        logger.warning(f"Failed to create answer for question {question_id}: {answer_result}")
+                    answer_records.append(answer_record)
 
                     maps_to = question.get('Maps_To__c')
                     if assessment_id and maps_to and maps_to.startswith('Assessment__c.'):
@@ -140,15 +139,17 @@ class InterviewAnswerService:
                                 assessment_updates[assessment_field] = coerced_value
                         
                 except Exception as e:
-                    logger.warning(f"Failed to create answer for question {question_id}: {e}", exc_info=True)
+                    logger.warning("Failed to create answer for question %s: %s", question_id, e, exc_info=True)
                     # Continue with other answers even if one fails
                     continue
 
+            answer_count = self._create_answer_records(answer_records)
+
             if answers and answer_count == 0:
                 raise Exception('Failed to save any interview answers to Salesforce')
 
             if assessment_id and assessment_updates:
-                logger.debug(f"Updating Assessment {assessment_id} with mapped answers: {assessment_updates}")
+                logger.debug("Updating Assessment %s with mapped answers: %s", assessment_id, assessment_updates)
                 _sf(
                     _api(f"/sobjects/Assessment__c/{assessment_id}"),
                     method="PATCH",
@@ -157,7 +158,7 @@ class InterviewAnswerService:
 
             document_generated = self._trigger_document_generation(interaction_summary_id)
             
-            logger.info(f"Created {answer_count} InterviewAnswer records")
+            logger.info("Created %s InterviewAnswer records", answer_count)
             
             return {
                 'success': True,
@@ -169,9 +170,47 @@ class InterviewAnswerService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to save interview answers: {e}", exc_info=True)
+            logger.error("Failed to save interview answers: %s", e, exc_info=True)
             raise
 
+    def _create_answer_records(self, answer_records: list[Dict[str, Any]]) -> int:
+        """
+        Create InterviewAnswer__c records via Composite sObject Collections
+        (200 per request) and return how many were created. Records the
+        collection call explicitly rejects are retried one by one; records
+        whose request failed outright are not re-sent, since Salesforce may
+        already have created them.
+        """
+        if not answer_records:
+            return 0
+
+        logger.debug("Creating %s InterviewAnswer records", len(answer_records))
+        try:
+            results = get_sf_client().create_many('InterviewAnswer__c', answer_records)
+        except SFCompositeError as e:
+            results = e.results
+            logger.error(
+                "Composite InterviewAnswer create failed; %s of %s answers in unknown state: %s",
+                len(answer_records) - len(results), len(answer_records), e,
+            )
+
+        answer_count = 0
+        for answer_record, result in zip(answer_records, results):
+            if result.get('success'):
+                answer_count += 1
+                continue
+            question_id = answer_record['InterviewQuestion__c']
+            try:
+                answer_result = _sf(_api("/sobjects/InterviewAnswer__c/"), method="POST", json=answer_record)
+            except Exception as e:
+                logger.warning("Failed to create answer for question %s: %s", question_id, e, exc_info=True)
+                continue
+            if answer_result and 'id' in answer_result:
+                answer_count += 1
+            else:
+                logger.warning("Failed to create answer for question %s: %s", question_id, answer_result)
+        return answer_count
+
     def _get_case_context(self, case_id: str) -> Dict[str, Any]:
         result = _query(f"SELECT Id, AccountId FROM Case WHERE Id = '{case_id}' LIMIT 1")
         records = result.get('records', [])
@@ -279,14 +318,13 @@ class InterviewAnswerService:
 
         try:
             _, instance_url = _get_token()
-            response = httpx.post(
+            response = _docgen_http.post(
                 self._get_docgen_url('/trigger-interview-doc'),
                 json={
                     'record_id': interaction_summary_id,
                     'preview': False,
                     'instance_url': instance_url,
                 },
-                timeout=120.0,
             )
             response.raise_for_status()
             payload = response.json()
@@ -357,7 +395,7 @@ class InterviewAnswerService:
         try:
             fields = self._get_object_fields('Assessment__c')
         except Exception as exc:
-            logger.warning(f"Assessment__c describe failed; skipping assessment create: {exc}")
+            logger.warning("Assessment__c describe failed; skipping assessment create: %s", exc)
             return None
 
         payload: Dict[str, Any] = {}
@@ -1,120 +1,417 @@
 # server/app/salesforce/interview_template_service.py
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, List
-from .sf_client import SalesforceClient
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from . import response_cache
+from .sf_client import SFError, SalesforceClient, get_sf_client, is_sf_id
 
 logger = logging.getLogger("interview_template_service")
 
+# Template versions change at admin-edit frequency; the list is reused for this long
+TEMPLATES_CACHE_TTL = 5 * 60
+# The persistent response cache sits below the in-memory caches, so the budget is split
+# between the layers: a list is never older than TEMPLATES_CACHE_TTL end to end
+TEMPLATES_RESPONSE_CACHE_TTL = TEMPLATES_CACHE_TTL // 2
+_TEMPLATES_MEMORY_TTL = TEMPLATES_CACHE_TTL - TEMPLATES_RESPONSE_CACHE_TTL
+
+# (expires_at, templates) - expires_at is on the time.monotonic() clock
+_templates_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+# Held while refreshing so concurrent misses share one Salesforce query
+_templates_lock = threading.Lock()
+
+# Questions are edited with their template version; per-version lists are reused for this long
+QUESTIONS_CACHE_TTL = 5 * 60
+QUESTIONS_CACHE_SIZE = 512
+
+# {template_version_id: (expires_at, questions)} - expires_at is on the time.monotonic() clock
+_questions_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_questions_lock = threading.Lock()
+
+# InterviewQuestion__c rows for one template version, bound as :vid. Field names from the
+# Salesforce schema (confirmed from InterviewTemplateController.cls): Label__c (not
+# QuestionText__c), Response_Type__c (not QuestionType__c), Required__c (not
+# IsRequired__c), Order__c (not DisplayOrder__c). Rows are ordered in Python with
+# _question_sort_key rather than by an ORDER BY on the unindexed Order__c.
+_QUESTIONS_SOQL = (
+    "SELECT Id, Name, Label__c, API_Name__c, Response_Type__c, Required__c, "
+    "Maps_To__c, Help_Text__c, Order__c, Section__c, Sensitive__c, "
+    "Score_Weight__c, Picklist_Values__c "
+    "FROM InterviewQuestion__c "
+    "WHERE InterviewTemplateVersion__c = :vid"
+)
+# Navigation-only projection of the same rows; full question fields are fetched per question
+_QUESTION_SUMMARIES_SOQL = (
+    "SELECT Id, Label__c, Required__c, Order__c "
+    "FROM InterviewQuestion__c "
+    "WHERE InterviewTemplateVersion__c = :vid "
+    "ORDER BY Order__c ASC, Name ASC"
+)
+_QUESTION_SOQL = (
+    "SELECT Id, Name, Label__c, API_Name__c, Response_Type__c, Required__c, "
+    "Maps_To__c, Help_Text__c, Order__c, Section__c, Sensitive__c, "
+    "Score_Weight__c, Picklist_Values__c "
+    "FROM InterviewQuestion__c "
+    "WHERE Id = :qid"
+)
+# Same rows for many versions at once; ids are validated with is_sf_id() before substitution
+_QUESTIONS_IN_SOQL = (
+    "SELECT Id, Name, InterviewTemplateVersion__c, Label__c, API_Name__c, Response_Type__c, "
+    "Required__c, Maps_To__c, Help_Text__c, Order__c, Section__c, Sensitive__c, "
+    "Score_Weight__c, Picklist_Values__c "
+    "FROM InterviewQuestion__c "
+    "WHERE InterviewTemplateVersion__c IN (%s)"
+)
+# Version ids per IN query, keeping the SOQL text well under its length limit
+QUESTIONS_IN_BATCH_SIZE = 200
+
+# Active, mobile-available template versions; matches InterviewTemplateController.getActiveTemplates()
+_TEMPLATE_FIELDS = (
+    "Id, Name, InterviewTemplate__c, InterviewTemplate__r.Name, "
+    "InterviewTemplate__r.Category__c, Status__c, Variant__c, "
+    "Effective_From__c, Effective_To__c"
+)
+_TEMPLATES_WHERE = (
+    "FROM InterviewTemplateVersion__c "
+    "WHERE InterviewTemplate__r.Active__c = true "
+    "AND InterviewTemplate__r.Available_for_Mobile__c = true "
+    "AND Status__c = 'Active' "
+    "ORDER BY InterviewTemplate__r.Name, Variant__c, Name"
+)
+_TEMPLATES_SOQL = f"SELECT {_TEMPLATE_FIELDS} {_TEMPLATES_WHERE}"
+
+# Child relationship from InterviewTemplateVersion__c to its InterviewQuestion__c rows
+QUESTIONS_RELATIONSHIP = "InterviewQuestions__r"
+_TEMPLATES_WITH_QUESTIONS_SOQL = (
+    f"SELECT {_TEMPLATE_FIELDS}, "
+    "(SELECT Id, Name, Label__c, API_Name__c, Response_Type__c, Required__c, "
+    "Maps_To__c, Help_Text__c, Order__c, Section__c, Sensitive__c, "
+    "Score_Weight__c, Picklist_Values__c "
+    f"FROM {QUESTIONS_RELATIONSHIP} ORDER BY Order__c ASC, Name ASC) "
+    f"{_TEMPLATES_WHERE}"
+)
+# Cleared if the org rejects the relationship name; templates and questions are then
+# loaded with two queries instead
+_questions_subquery_supported = True
+
+# (output key, InterviewQuestion__c field, default) for the frontend question shape
+_QUESTION_FIELD_MAP = (
+    ('Id', 'Id', None),
+    ('Name', 'Name', None),
+    ('QuestionText', 'Label__c', None),
+    ('QuestionType', 'Response_Type__c', None),
+    ('IsRequired', 'Required__c', False),
+    ('ApiName', 'API_Name__c', None),
+    ('MapsTo', 'Maps_To__c', None),
+    ('HelpText', 'Help_Text__c', None),
+    ('Section', 'Section__c', None),
+    ('Sensitive', 'Sensitive__c', False),
+    ('ScoreWeight', 'Score_Weight__c', None),
+    ('Options', 'Picklist_Values__c', None),
+    ('DisplayOrder', 'Order__c', None),
+)
+
+def _map_question(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an InterviewQuestion__c record onto the question shape used by the frontend"""
+    get = record.get
+    return {out: get(field, default) for out, field, default in _QUESTION_FIELD_MAP}
+
+# (output key, InterviewTemplateVersion__c field) and (output key, InterviewTemplate__r field)
+_TEMPLATE_FIELD_MAP = (
+    ('templateId', 'InterviewTemplate__c'),
+    ('templateVersionId', 'Id'),
+    ('versionName', 'Name'),
+    ('variant', 'Variant__c'),
+    ('status', 'Status__c'),
+    ('effectiveFrom', 'Effective_From__c'),
+    ('effectiveTo', 'Effective_To__c'),
+)
+_TEMPLATE_PARENT_FIELD_MAP = (
+    ('templateName', 'Name'),
+    ('category', 'Category__c'),
+)
+
+def _map_template(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an InterviewTemplateVersion__c record onto the template summary used by the frontend"""
+    get = record.get
+    template_data = {out: get(field) for out, field in _TEMPLATE_FIELD_MAP}
+    # Flatten the parent template once per record
+    get_parent = (get('InterviewTemplate__r') or {}).get
+    template_data.update((out, get_parent(field)) for out, field in _TEMPLATE_PARENT_FIELD_MAP)
+    return template_data
+
+def _map_template_with_questions(record: Dict[str, Any], question_records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map a template record, attaching its (fully paged) question records under 'questions'"""
+    template_data = _map_template(record)
+    template_data['questions'] = list(map(_map_question, question_records))
+    return template_data
+
+def _question_sort_key(question: Dict[str, Any]) -> Tuple[bool, float, str]:
+    """Display order, then name; questions without an order come first (SOQL ASC NULLS FIRST)"""
+    order = question['DisplayOrder']
+    return order is not None, order or 0, question['Name'] or ''
+
+def _bucket_questions(questions: Dict[str, List[Dict[str, Any]]], records: Iterable[Dict[str, Any]]) -> None:
+    """Append mapped question records to their version's list in ``questions``, in display order"""
+    touched = []
+    for record in records:
+        bucket = questions.get(record.get('InterviewTemplateVersion__c'))
+        if bucket is not None:
+            if not bucket:
+                touched.append(bucket)
+            bucket.append(_map_question(record))
+    for bucket in touched:
+        bucket.sort(key=_question_sort_key)
+
+def _get_cached_questions(template_version_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the unexpired cached question lists for the given version ids"""
+    now = time.monotonic()
+    hits: Dict[str, List[Dict[str, Any]]] = {}
+    with _questions_lock:
+        for vid in template_version_ids:
+            cached = _questions_cache.get(vid)
+            if cached is not None and cached[0] > now:
+                hits[vid] = cached[1]
+    return hits
+
+def _cache_questions(questions: Dict[str, List[Dict[str, Any]]], ttl: float = QUESTIONS_CACHE_TTL) -> None:
+    """Store freshly queried question lists, keyed by version id, for ttl seconds"""
+    expires_at = time.monotonic() + ttl
+    with _questions_lock:
+        for vid, items in questions.items():
+            if len(_questions_cache) >= QUESTIONS_CACHE_SIZE and vid not in _questions_cache:
+                # Evict expired entries first, then the oldest if still full
+                now = time.monotonic()
+                for key in [k for k, (expires, _) in _questions_cache.items() if expires <= now]:
+                    del _questions_cache[key]
+                if len(_questions_cache) >= QUESTIONS_CACHE_SIZE:
+                    del _questions_cache[next(iter(_questions_cache))]
+            _questions_cache[vid] = (expires_at, items)
+
 class InterviewTemplateService:
     """Service for managing Interview Templates"""
     
-    def __init__(self):
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
     
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the cached template list and questions so the next calls re-query Salesforce."""
+        global _templates_cache
+        with _templates_lock:
+            _templates_cache = None
+        with _questions_lock:
+            _questions_cache.clear()
+        response_cache.clear()
+
     def get_mobile_available_templates(self) -> List[Dict[str, Any]]:
-        """Fetch interview templates marked as Active, matching Apex controller getActiveTemplates()"""
+        """
+        Fetch interview templates marked as Active, matching Apex controller getActiveTemplates().
+        Results are at most TEMPLATES_CACHE_TTL seconds old and the last good list is served
+        if a refresh fails; callers must treat the returned list as read-only.
+        """
+        global _templates_cache
+        cached = _templates_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        with _templates_lock:
+            # Another thread may have refreshed while we waited for the lock
+            cached = _templates_cache
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            try:
+                templates = self._fetch_mobile_available_templates()
+            except Exception as e:
+                if cached is not None and cached[1]:
+                    logger.warning("Failed to refresh mobile-available templates; serving cached list: %s", e)
+                    return cached[1]
+                logger.error("Failed to fetch mobile-available templates: %s", e, exc_info=True)
+                # Return empty list instead of raising to prevent breaking the UI
+                return []
+            _templates_cache = (time.monotonic() + _TEMPLATES_MEMORY_TTL, templates)
+            return templates
+
+    def _fetch_mobile_available_templates(self) -> List[Dict[str, Any]]:
+        """Query active, mobile-available template versions from Salesforce."""
+        logger.info("Fetching active interview templates")
+        
+        # Query matches InterviewTemplateController.getActiveTemplates() SOQL:
+        # - InterviewTemplate__r.Active__c = true
+        # - Status__c = 'Active'
+        logger.debug("Query criteria: InterviewTemplate.Active__c=true AND Status__c='Active'")
+        
+        logger.debug("Executing SOQL: %s", _TEMPLATES_SOQL)
+        # Shared with other workers through the persistent response cache
+        result = self.sf_client.query(_TEMPLATES_SOQL, cache_ttl=TEMPLATES_RESPONSE_CACHE_TTL)
+        
+        if result and 'records' in result:
+            templates = list(map(_map_template, result['records']))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Templates: %r", templates)
+            logger.info("Found %s active interview templates", len(templates))
+            return templates
+        
+        logger.info("No active interview templates found")
+        return []
+
+    def get_mobile_templates_with_questions(self) -> List[Dict[str, Any]]:
+        """
+        Fetch mobile-available templates with their questions under 'questions'.
+        Uses one SOQL query with a child-relationship subquery; if the org rejects the
+        relationship, falls back to the template list plus batched question queries.
+        """
+        global _questions_subquery_supported
         try:
-            logger.info("Fetching active interview templates")
-            
-            # Query matches InterviewTemplateController.getActiveTemplates() SOQL:
-            # - InterviewTemplate__r.Active__c = true
-            # - Status__c = 'Active'
-            logger.debug("Query criteria: InterviewTemplate.Active__c=true AND Status__c='Active'")
-            
-            soql = """
-                SELECT Id, Name, InterviewTemplate__c, InterviewTemplate__r.Name,
-                       InterviewTemplate__r.Category__c, Status__c, Variant__c,
-                       Effective_From__c, Effective_To__c
-                FROM InterviewTemplateVersion__c
-                WHERE InterviewTemplate__r.Active__c = true
-                AND InterviewTemplate__r.Available_for_Mobile__c = true
-                AND Status__c = 'Active'
-                ORDER BY InterviewTemplate__r.Name, Variant__c, Name
-            """
-            
-            logger.debug(f"Executing SOQL: {soql}")
-            result = self.sf_client.query(soql)
-            
-            logger.debug(f"Query result: {result}")
-            
-            if result and 'records' in result:
-                templates = []
-                for record in result['records']:
-                    template_rel = record.get('InterviewTemplate__r', {})
-                    template_data = {
-                        'templateId': record.get('InterviewTemplate__c'),
-                        'templateVersionId': record.get('Id'),
-                        'templateName': template_rel.get('Name'),
-                        'category': template_rel.get('Category__c'),
-                        'versionName': record.get('Name'),
-                        'variant': record.get('Variant__c'),
-                        'status': record.get('Status__c'),
-                        'effectiveFrom': record.get('Effective_From__c'),
-                        'effectiveTo': record.get('Effective_To__c')
-                    }
-                    logger.debug(f"Template: {template_data}")
-                    templates.append(template_data)
-                logger.info(f"Found {len(templates)} active interview templates")
-                return templates
-            
-            logger.info("No active interview templates found")
-            return []
-            
+            if _questions_subquery_supported:
+                try:
+                    records = self.sf_client.query_all(_TEMPLATES_WITH_QUESTIONS_SOQL, cache_ttl=TEMPLATES_RESPONSE_CACHE_TTL)
+                except SFError as e:
+                    if QUESTIONS_RELATIONSHIP not in str(e):
+                        raise
+                    logger.warning("%s subquery not supported; loading questions separately: %s", QUESTIONS_RELATIONSHIP, e)
+                    _questions_subquery_supported = False
+                else:
+                    # Question blocks over the subquery page size carry their own nextRecordsUrl
+                    templates = [
+                        _map_template_with_questions(record, self.sf_client.child_records(record, QUESTIONS_RELATIONSHIP))
+                        for record in records
+                    ]
+                    # Built from a possibly persisted response, so only the rest of the budget remains
+                    _cache_questions({t['templateVersionId']: t['questions'] for t in templates}, _TEMPLATES_MEMORY_TTL)
+                    logger.info("Found %s active interview templates with questions", len(templates))
+                    return templates
+
+            templates = [dict(template) for template in self.get_mobile_available_templates()]
+            questions = self._get_questions_for_versions([t['templateVersionId'] for t in templates])
+            for template in templates:
+                template['questions'] = questions.get(template['templateVersionId'], [])
+            return templates
+
         except Exception as e:
-            logger.error(f"Failed to fetch mobile-available templates: {e}", exc_info=True)
+            logger.error("Failed to fetch mobile-available templates with questions: %s", e, exc_info=True)
             # Return empty list instead of raising to prevent breaking the UI
             return []
 
+    def _get_questions_for_versions(self, template_version_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Blocking counterpart of get_questions_for_templates(), one IN query per batch."""
+        questions: Dict[str, List[Dict[str, Any]]] = {vid: [] for vid in template_version_ids}
+        cached = _get_cached_questions(list(questions))
+        questions.update(cached)
+        vids = [vid for vid in questions if vid not in cached and is_sf_id(vid)]
+        for i in range(0, len(vids), QUESTIONS_IN_BATCH_SIZE):
+            batch = vids[i:i + QUESTIONS_IN_BATCH_SIZE]
+            # One batch can exceed a result page; iter_query follows nextRecordsUrl
+            _bucket_questions(questions, self.sf_client.iter_query(_QUESTIONS_IN_SOQL % ", ".join(f"'{vid}'" for vid in batch)))
+            _cache_questions({vid: questions[vid] for vid in batch})
+        return questions
+
     def get_questions_for_template(self, template_version_id: str) -> List[Dict[str, Any]]:
-        """Fetch interview questions for a specific template version"""
+        """
+        Fetch interview questions for a specific template version. Results are cached for
+        QUESTIONS_CACHE_TTL seconds; callers must treat the returned list as read-only.
+        """
         try:
-            logger.info(f"Fetching interview questions for template version: {template_version_id}")
-            
-            # Query InterviewQuestion__c records where InterviewTemplateVersion__c matches
-            # Field names from Salesforce schema (confirmed from InterviewTemplateController.cls):
-            # Label__c (not QuestionText__c), Response_Type__c (not QuestionType__c), 
-            # Required__c (not IsRequired__c), Order__c (not DisplayOrder__c)
-            soql = f"""
-                SELECT Id, Name, Label__c, API_Name__c, Response_Type__c, Required__c,
-                       Maps_To__c, Help_Text__c, Order__c, Section__c, Sensitive__c, 
-                       Score_Weight__c, Picklist_Values__c
-                FROM InterviewQuestion__c
-                WHERE InterviewTemplateVersion__c = '{template_version_id}'
-                ORDER BY Order__c ASC, Name ASC
-            """
-            
-            logger.debug(f"Executing SOQL: {soql}")
-            result = self.sf_client.query(soql)
+            logger.info("Fetching interview questions for template version: %s", template_version_id)
             
-            logger.debug(f"Query result for questions: {result}")
-            
-            if result and 'records' in result:
-                questions = []
-                for record in result['records']:
-                    question_data = {
-                        'Id': record.get('Id'),
-                        'Name': record.get('Name'),
-                        'QuestionText': record.get('Label__c'),  # Map Label__c to QuestionText for frontend
-                        'QuestionType': record.get('Response_Type__c'),  # Map Response_Type__c to QuestionType
-                        'IsRequired': record.get('Required__c', False),  # Map Required__c to IsRequired
-                        'ApiName': record.get('API_Name__c'),
-                        'MapsTo': record.get('Maps_To__c'),
-                        'HelpText': record.get('Help_Text__c'),
-                        'Section': record.get('Section__c'),
-                        'Sensitive': record.get('Sensitive__c', False),
-                        'ScoreWeight': record.get('Score_Weight__c'),
-                        'Options': record.get('Picklist_Values__c'),  # Map Picklist_Values__c to Options
-                        'DisplayOrder': record.get('Order__c')  # Map Order__c to DisplayOrder
-                    }
-                    logger.debug(f"Question: {question_data}")
-                    questions.append(question_data)
-                logger.info(f"Found {len(questions)} questions for template version {template_version_id}")
-                return questions
+            if not is_sf_id(template_version_id):
+                logger.warning("Invalid template version id: %r", template_version_id)
+                return []
+
+            cached = _get_cached_questions([template_version_id])
+            if cached:
+                return cached[template_version_id]
+
+            logger.debug("Executing SOQL: %s", _QUESTIONS_SOQL)
+            # Records stream page by page; later pages are fetched while earlier ones are mapped
+            questions = list(map(_map_question, self.sf_client.iter_query(_QUESTIONS_SOQL, {"vid": template_version_id})))
+            questions.sort(key=_question_sort_key)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Questions: %r", questions)
+
+            if not questions:
+                logger.warning("No questions found for template version %s", template_version_id)
+            logger.info("Found %s questions for template version %s", len(questions), template_version_id)
+            _cache_questions({template_version_id: questions})
+            return questions
             
-            logger.warning(f"No questions found for template version {template_version_id}")
+        except Exception as e:
+            logger.error("Failed to fetch questions for template version %s: %s", template_version_id, e, exc_info=True)
+            # Return empty list instead of raising
             return []
-            
+
+    # Full question rows, as opposed to get_question_summaries_for_template()
+    get_question_details_for_template = get_questions_for_template
+
+    def get_question_summaries_for_template(self, template_version_id: str) -> List[Dict[str, Any]]:
+        """
+        Fetch only Id, text, required flag and order for a template version's questions,
+        for rendering navigation before the full questions are needed.
+        """
+        try:
+            if not is_sf_id(template_version_id):
+                logger.warning("Invalid template version id: %r", template_version_id)
+                return []
+
+            result = self.sf_client.query(_QUESTION_SUMMARIES_SOQL, {"vid": template_version_id})
+            return [
+                {
+                    'Id': record.get('Id'),
+                    'QuestionText': record.get('Label__c'),
+                    'IsRequired': record.get('Required__c', False),
+                    'DisplayOrder': record.get('Order__c'),
+                }
+                for record in result.get('records', [])
+            ]
+
         except Exception as e:
-            logger.error(f"Failed to fetch questions for template version {template_version_id}: {e}", exc_info=True)
+            logger.error("Failed to fetch question summaries for template version %s: %s", template_version_id, e, exc_info=True)
             # Return empty list instead of raising
             return []
+
+    def get_question(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one interview question with all fields, or None if it does not exist"""
+        if not is_sf_id(question_id):
+            logger.warning("Invalid question id: %r", question_id)
+            return None
+
+        records = self.sf_client.query(_QUESTION_SOQL, {"qid": question_id}).get('records', [])
+        return _map_question(records[0]) if records else None
+
+    async def get_questions_for_templates(self, template_version_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch questions for several template versions, keyed by version id. Versions not
+        in the question cache are loaded with one IN query per QUESTIONS_IN_BATCH_SIZE ids
+        (batches run concurrently, each following nextRecordsUrl to the last page).
+        Invalid ids and ids in a failed batch map to an empty list, as in
+        get_questions_for_template().
+        """
+        questions: Dict[str, List[Dict[str, Any]]] = {vid: [] for vid in template_version_ids}
+        cached = _get_cached_questions(list(questions))
+        questions.update(cached)
+        valid = [vid for vid in questions if is_sf_id(vid)]
+        if len(valid) < len(questions):
+            logger.warning("Skipping %s invalid template version ids", len(questions) - len(valid))
+        vids = [vid for vid in valid if vid not in cached]
+
+        batches = [vids[i:i + QUESTIONS_IN_BATCH_SIZE] for i in range(0, len(vids), QUESTIONS_IN_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self.sf_client.async_query_all(_QUESTIONS_IN_SOQL % ", ".join(f"'{vid}'" for vid in batch))
+              for batch in batches),
+            return_exceptions=True,
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to fetch questions for %s template versions: %s", len(batch), result)
+                continue
+            _bucket_questions(questions, result)
+            _cache_questions({vid: questions[vid] for vid in batch})
+        return questions
+
+
+@functools.lru_cache(maxsize=None)
+def get_interview_template_service() -> InterviewTemplateService:
+    """Process-wide InterviewTemplateService sharing the process-wide SalesforceClient."""
+    return InterviewTemplateService()
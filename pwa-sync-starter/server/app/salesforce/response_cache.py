@@ -0,0 +1,86 @@
+# server/app/salesforce/response_cache.py
+"""
+Persistent cache for Salesforce query responses.
+
+Entries are JSON bytes keyed by a SHA-256 of (org, query) and stored in a
+SQLite file shared by every worker process, so restarts and sibling workers
+reuse each other's results. Only callers that opt in (SalesforceClient.query
+with cache_ttl) read or write it.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from ..settings import settings
+
+# Default lifetime for cached responses
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+# Shared connection, opened once per process; sqlite3 connections are not
+# safe for concurrent use, so every statement runs under the lock
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = settings.SF_RESPONSE_CACHE_PATH
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sf_responses (
+                key TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                body BLOB NOT NULL
+            )
+        """)
+        # Drop whatever expired while no process was running
+        conn.execute("DELETE FROM sf_responses WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def make_key(query: str) -> str:
+    """Cache key for a query against the configured org."""
+    org = f"{settings.SF_ENV}|{settings.SALESFORCE_USERNAME}"
+    return hashlib.sha256(f"{org}|{query}".encode()).hexdigest()
+
+
+def get(key: str) -> Optional[bytes]:
+    """Return the cached body for key, or None if missing or expired."""
+    with _lock:
+        row = _connection().execute(
+            "SELECT expires_at, body FROM sf_responses WHERE key = ?", (key,)
+        ).fetchone()
+    # Wall-clock expiry, since entries outlive the process that wrote them
+    if row is None or row[0] <= time.time():
+        return None
+    return row[1]
+
+
+def put(key: str, body: bytes, ttl: float = DEFAULT_TTL) -> None:
+    """Store body under key for ttl seconds."""
+    with _lock:
+        conn = _connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sf_responses (key, expires_at, body) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, body),
+            )
+
+
+def clear() -> None:
+    """Drop every cached response."""
+    with _lock:
+        conn = _connection()
+        with conn:
+            conn.execute("DELETE FROM sf_responses")
@@ -1,19 +1,29 @@
 
 # server/app/salesforce/sf_client.py
 from __future__ import annotations
+import asyncio
+import atexit
+import functools
 import json
 import logging
 import os
 from pathlib import Path
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from itertools import islice
 from urllib.parse import quote_plus
 
 import httpx
 import jwt  # PyJWT
+import orjson
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 
 from ..settings import settings  
+from . import response_cache
 
 logger = logging.getLogger("sf_client")
 
@@ -25,13 +35,68 @@ class SFAuthError(Exception):
 class SFError(Exception):
     pass
 
+class SFCompositeError(SFError):
+    """A collection request failed part-way; ``results`` holds the results of
+    the chunks that completed, in input order. Records after them are in an
+    unknown state (the failed chunk may have been committed) and must not be
+    blindly re-sent."""
+    def __init__(self, message: str, results: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.results = results
+
+# -------------------- HTTP client --------------------
+# One pooled client for every Salesforce call so TCP/TLS connections are kept
+# alive and reused; connection failures are retried by the transport
+SF_HTTP_POOL_SIZE = 32
+_http = httpx.Client(
+    timeout=30.0,
+    headers={"Connection": "keep-alive"},
+    transport=httpx.HTTPTransport(
+        limits=httpx.Limits(
+            max_connections=SF_HTTP_POOL_SIZE,
+            max_keepalive_connections=SF_HTTP_POOL_SIZE,
+        ),
+        retries=3,
+    ),
+)
+atexit.register(_http.close)
+# Async counterpart for calls made on the event loop (e.g. concurrent queries
+# fanned out with asyncio.gather); closed by close_async_client() on shutdown
+_http_async = httpx.AsyncClient(
+    timeout=30.0,
+    headers={"Connection": "keep-alive"},
+    transport=httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=SF_HTTP_POOL_SIZE,
+            max_keepalive_connections=SF_HTTP_POOL_SIZE,
+        ),
+        retries=3,
+    ),
+)
+
+async def close_async_client() -> None:
+    """Close the shared async Salesforce client (call on app shutdown)."""
+    await _http_async.aclose()
+
 # -------------------- Token cache --------------------
 # Simple in-memory caches
 _account_fields_cache: set[str] | None = None
-# {sobject: describe_result}
-_describe_cache: Dict[str, Dict[str, Any]] = {}
-# (access_token, instance_url, expires_at_epoch)
+# {sobject: (expires_at, describe_result)} - expires_at is on the time.monotonic() clock
+_describe_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# Describe results are refetched after this long so org schema changes are picked up
+DESCRIBE_CACHE_TTL = 60 * 60
+# Access tokens are treated as valid for this long after issue
+TOKEN_TTL = 14 * 60
+# Within this long of expiry a background refresh starts while the cached token keeps being served
+TOKEN_REFRESH_AHEAD = 120
+# (access_token, instance_url, expires_at) - expires_at is on the time.monotonic() clock
 _token_cache: Optional[Tuple[str, str, float]] = None
+# Held while a token is being fetched, so concurrent callers wait for one exchange
+_token_lock = threading.Lock()
+# Signed assertions are reused for this long (they are valid for 3 minutes)
+JWT_ASSERTION_TTL = 60
+# {(iss, sub, aud): (expires_at, assertion)} - expires_at is on the time.time() clock
+_assertion_cache: Dict[Tuple[str, str, str], Tuple[float, str]] = {}
 
 def clear_all_caches():
     """Clear all in-memory caches - useful for debugging cache issues"""
@@ -40,6 +105,8 @@ def clear_all_caches():
     _describe_cache.clear()
     _token_cache = None
     _person_rt_cache = None
+    _assertion_cache.clear()
+    _private_key_obj.cache_clear()
 SERVER_DIR = Path(__file__).resolve().parents[1]
 def _resolve_key_path(path_str: str) -> Path:
     raw = str(path_str).strip().strip('"').strip("'")
@@ -73,6 +140,11 @@ def _read_private_key() -> str:
         raise SFAuthError(f"Private key path points to a directory, not a file: {p}")
     return p.read_text(encoding="utf-8")
 
+@functools.lru_cache(maxsize=1)
+def _private_key_obj():
+    """Parsed RSA signing key, loaded once per process; PyJWT signs with it directly."""
+    return load_pem_private_key(_read_private_key().encode("utf-8"), password=None)
+
 def _jwt_assertion() -> str:
     now = int(time.time())
     # For sandboxes the JWT audience is test.salesforce.com; for prod it's login.salesforce.com
@@ -80,20 +152,66 @@ def _jwt_assertion() -> str:
     # Check for sandbox by looking for .sandbox. in the URL
     is_sandbox = ".sandbox." in login_url or "test.salesforce.com" in login_url
     aud = "https://test.salesforce.com" if is_sandbox else "https://login.salesforce.com"
+    key = (settings.SALESFORCE_CLIENT_ID, settings.SALESFORCE_USERNAME, aud)
+    cached = _assertion_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
     payload = {
-        "iss": settings.SALESFORCE_CLIENT_ID,
-        "sub": settings.SALESFORCE_USERNAME,
+        "iss": key[0],
+        "sub": key[1],
         "aud": aud,
         "exp": now + 180,  # 3 minutes
     }
-    return jwt.encode(payload, _read_private_key(), algorithm="RS256")
+    assertion = jwt.encode(payload, _private_key_obj(), algorithm="RS256")
+    _assertion_cache[key] = (now + JWT_ASSERTION_TTL, assertion)
+    return assertion
+
+def _cached_token() -> Optional[Tuple[str, str]]:
+    """Return the cached (access_token, instance_url) if it is still fresh, else None.
+
+    Once the token is within TOKEN_REFRESH_AHEAD of expiry a background
+    refresh is started, so callers rarely wait on the token endpoint.
+    """
+    cached = _token_cache
+    if not cached:
+        return None
+    remaining = cached[2] - time.monotonic()
+    if remaining <= 30:
+        return None
+    if remaining <= TOKEN_REFRESH_AHEAD:
+        _refresh_token_ahead()
+    return cached[0], cached[1]
+
+def _refresh_token_ahead() -> None:
+    """Fetch a new token on a daemon thread unless a fetch is already running."""
+    if not _token_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_refresh_token_locked, name="sf-token-refresh", daemon=True).start()
+
+def _refresh_token_locked() -> None:
+    try:
+        _fetch_token()
+    except Exception as e:
+        # The current token is still valid; the next caller retries
+        logger.warning("Background Salesforce token refresh failed: %s", e)
+    finally:
+        _token_lock.release()
 
 def _get_token() -> Tuple[str, str]:
     """Return (access_token, instance_url), caching for ~14 minutes."""
-    global _token_cache
-    if _token_cache and (_token_cache[2] - time.time() > 30):
-        return _token_cache[0], _token_cache[1]
+    cached = _cached_token()
+    if cached:
+        return cached
+    with _token_lock:
+        # Another thread may have refreshed while this one waited for the lock
+        cached = _cached_token()
+        if cached:
+            return cached
+        return _fetch_token()
 
+def _fetch_token() -> Tuple[str, str]:
+    """Exchange a JWT assertion for a new access token and cache it (caller holds _token_lock)."""
+    global _token_cache
     # Build token URL - convert lightning.force.com to my.salesforce.com for token endpoint
     login_url = settings.SALESFORCE_LOGIN_URL.rstrip("/")
     if ".lightning.force.com" in login_url:
@@ -109,16 +227,23 @@ def _get_token() -> Tuple[str, str]:
     headers = {
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    resp = httpx.post(token_url, data=data, headers=headers, timeout=30.0)
+    resp = _http.post(token_url, data=data, headers=headers)
     if resp.status_code != 200:
         raise SFAuthError(f"JWT auth failed: {resp.status_code} {resp.text}")
-    j = resp.json()
+    j = orjson.loads(resp.content)
     access_token = j["access_token"]
     instance_url = j["instance_url"]
-    _token_cache = (access_token, instance_url, time.time() + 14 * 60)
+    _token_cache = (access_token, instance_url, time.monotonic() + TOKEN_TTL)
     return access_token, instance_url
 
 # -------------------- REST helpers --------------------
+# Maximum records per Composite sObject Collections request
+COMPOSITE_COLLECTION_LIMIT = 200
+
+# Fetches the next page of a query result (nextRecordsUrl) while the caller
+# is still processing the current one
+_page_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sf-next-page")
+
 # Utility to get a Program's Salesforce Id by name
 def get_program_id(program_name: str) -> str | None:
     """Return the Salesforce Id for a Program by name, or None if not found."""
@@ -135,23 +260,146 @@ def _api(path: str) -> str:
     ver = getattr(settings, "SALESFORCE_API_VERSION", "v61.0")
     return f"/services/data/{ver}{path}"
 
-def _sf(path: str, *, method: str = "GET", json: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    """Call Salesforce REST API with a Bearer token."""
+def _sf(
+    path: str,
+    *,
+    method: str = "GET",
+    json: Dict[str, Any] | None = None,
+    content: bytes | None = None,
+) -> Dict[str, Any]:
+    """Call Salesforce REST API with a Bearer token.
+
+    ``json`` is encoded with orjson; pass ``content`` instead to send a body
+    that is already JSON-encoded.
+    """
     token, base = _get_token()
     url = f"{base}{path}"
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    resp = httpx.request(method, url, headers=headers, json=json, timeout=30.0)
+    if json is not None:
+        content = orjson.dumps(json, option=orjson.OPT_NON_STR_KEYS)
+    resp = _http.request(method, url, headers=headers, content=content)
     # Salesforce returns errors as JSON arrays; propagate details for debugging
     if resp.status_code >= 400:
         raise SFError(f"{method} {path} -> {resp.status_code} {resp.text}")
-    if not resp.text:
+    # Parse the raw bytes with orjson; no intermediate str decode of the body
+    body = resp.content
+    if not body:
         return {}
-    return resp.json()
+    return orjson.loads(body)
+
+async def _sf_async(path: str, *, method: str = "GET", json: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """_sf() over the shared async client, for use on the event loop."""
+    # A token refresh is a blocking JWT exchange, so it runs in a worker thread
+    token, base = _cached_token() or await asyncio.to_thread(_get_token)
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    content = orjson.dumps(json, option=orjson.OPT_NON_STR_KEYS) if json is not None else None
+    resp = await _http_async.request(method, f"{base}{path}", headers=headers, content=content)
+    if resp.status_code >= 400:
+        raise SFError(f"{method} {path} -> {resp.status_code} {resp.text}")
+    body = resp.content
+    if not body:
+        return {}
+    return orjson.loads(body)
+
+def _sf_composite(
+    sobject: str,
+    records: List[Dict[str, Any]],
+    *,
+    method: str = "POST",
+    ext_field: str | None = None,
+    all_or_none: bool = False,
+) -> List[Dict[str, Any]]:
+    """Send records through the sObject Collections API, COMPOSITE_COLLECTION_LIMIT per request.
+
+    POST creates, PATCH updates by Id, and PATCH with ``ext_field`` upserts by
+    that external id. Returns one result ({"id", "success", "errors"}) per
+    input record, in order, so callers can handle partial failures. If a
+    request fails, SFCompositeError carries the results gathered so far.
+    """
+    path = _api(f"/composite/sobjects/{sobject}/{ext_field}" if ext_field else "/composite/sobjects")
+    results: List[Dict[str, Any]] = []
+    # One attributes dict shared by every record; orjson encodes it per reference
+    attributes = {"type": sobject}
+    for start in range(0, len(records), COMPOSITE_COLLECTION_LIMIT):
+        body = {
+            "allOrNone": all_or_none,
+            "records": [
+                {"attributes": attributes, **record}
+                for record in islice(records, start, start + COMPOSITE_COLLECTION_LIMIT)
+            ],
+        }
+        try:
+            results.extend(_sf(path, method=method, json=body))
+        except Exception as e:
+            raise SFCompositeError(
+                f"Collection {method} failed after {len(results)} of {len(records)} records: {e}",
+                results,
+            ) from e
+    return results
+
+# :name bind sites in SOQL passed to SalesforceClient.query (names start with a letter or
+# underscore, so time literals such as 10:00:00Z are left alone)
+_BIND_RE = re.compile(r":([A-Za-z_]\w*)")
+
+@functools.lru_cache(maxsize=256)
+def _bind_sites(soql: str) -> Tuple[str, ...]:
+    """Split SOQL once into alternating literal text and bind names: (text, name, text, ...)."""
+    return tuple(_BIND_RE.split(soql))
+
+def _bind_literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)  # Don't quote numbers
+    # Quote strings, escaping so a value can never close the literal
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+# 15- or 18-character Salesforce record Id
+_SF_ID_RE = re.compile(r"[A-Za-z0-9]{15}(?:[A-Za-z0-9]{3})?")
+
+def is_sf_id(value: Any) -> bool:
+    """True if value is shaped like a Salesforce record Id (safe to bind into SOQL)."""
+    return isinstance(value, str) and _SF_ID_RE.fullmatch(value) is not None
+
+_SF_ID_SUFFIX_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ012345"
+
+def sf_id18(value: str) -> str:
+    """Case-insensitive 18-character form of a 15-character Salesforce Id (the form
+    the REST API returns); other values are returned unchanged."""
+    if len(value) != 15 or not is_sf_id(value):
+        return value
+    suffix = "".join(
+        _SF_ID_SUFFIX_CHARS[sum(1 << i for i, ch in enumerate(value[start:start + 5]) if "A" <= ch <= "Z")]
+        for start in (0, 5, 10)
+    )
+    return value + suffix
+
+def _bind(soql: str, params: Dict[str, Any]) -> str:
+    """Substitute :name binds; bind sites are parsed once per distinct SOQL text and
+    names without a matching param are left as written."""
+    parts = list(_bind_sites(soql))
+    for i in range(1, len(parts), 2):
+        name = parts[i]
+        parts[i] = _bind_literal(params[name]) if name in params else f":{name}"
+    return "".join(parts)
 
 def _query(soql: str) -> Dict[str, Any]:
     # Use proper URL encoding for SOQL
     return _sf(_api(f"/query/?q={quote_plus(soql)}"))
 
+async def _query_async(soql: str) -> Dict[str, Any]:
+    return await _sf_async(_api(f"/query/?q={quote_plus(soql)}"))
+
+def _is_complete(result: Dict[str, Any]) -> bool:
+    """True if a query result has no further pages, top-level or in any subquery block."""
+    if result.get("nextRecordsUrl"):
+        return False
+    for record in result.get("records", []):
+        for value in record.values():
+            if isinstance(value, dict) and value.get("nextRecordsUrl"):
+                return False
+    return True
+
 # -------------------- Person Account helpers --------------------
 def _get_account_fields() -> set[str]:
     global _account_fields_cache
@@ -184,11 +432,11 @@ def get_person_account_record_type_id() -> Optional[str]:
         return _person_rt_cache
     return None
 
-def create_person_account(person: Dict[str, Any]) -> str:
+def build_person_account_payload(person: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Create a Person Account (uses Person* and PersonMailing* fields).
+    Build the Account fields for a Person Account (Person* and PersonMailing* fields).
     Also sets SSN 'Partial' on whichever status field your org exposes.
-    Only sends fields that actually exist in the sandbox (describe-driven).
+    Only includes fields that actually exist in the sandbox (describe-driven).
     """
     fields = _get_account_fields()
 
@@ -253,10 +501,18 @@ def create_person_account(person: Dict[str, Any]) -> str:
             payload[fname] = "Partial"
             break
 
-    # Finally create in Salesforce
+    return payload
+
+def create_person_account(person: Dict[str, Any]) -> str:
+    """Create a Person Account and return its Id."""
+    payload = build_person_account_payload(person)
     res = _sf(_api("/sobjects/Account/"), method="POST", json=payload)
     return res["id"]
 
+def create_person_accounts(people: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create Person Accounts in batches; one {"id", "success", "errors"} result per person, in order."""
+    return _sf_composite("Account", [build_person_account_payload(person) for person in people])
+
 def ingest_encounter(encounter_data: Dict[str, Any]) -> Dict[str, Any]:
     """Call the Apex REST endpoint to ingest a complete encounter"""
     path = "/services/apexrest/ProgramEnrollmentService/ingestEncounter"
@@ -391,6 +647,13 @@ def upsert_person_by_uuid(uuid: str, fields: dict) -> str:
     # For PATCH, no body is returned on success. You can query back if you need the Id.
     rec = _query(f"SELECT Id FROM Account WHERE UUID__c = '{uuid}' LIMIT 1")
     return rec["records"][0]["Id"]
+
+def upsert_people_by_uuid(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Upsert Accounts by UUID__c in batches; each record must carry its UUID__c.
+
+    Returns one {"id", "success", "errors", "created"} result per record, in order.
+    """
+    return _sf_composite("Account", records, method="PATCH", ext_field="UUID__c")
 # -------------------- Optional example client --------------------
 
 def query_soql(soql: str) -> dict:
@@ -408,6 +671,10 @@ def sobject_update(sobject: str, rec_id: str, payload: dict) -> None:
     """PATCH an sObject by Id."""
     _sf(_api(f"/sobjects/{sobject}/{rec_id}"), method="PATCH", json=payload)
 
+def sobject_update_many(sobject: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """PATCH sObjects in batches; each record must carry its Id. One result per record, in order."""
+    return _sf_composite(sobject, records, method="PATCH")
+
 def sobject_upsert_external(sobject: str, ext_field: str, ext_value: str, payload: dict) -> None:
     """PATCH /sobjects/{sobject}/{ext_field}/{ext_value} (upsert by external id)."""
     _sf(_api(f"/sobjects/{sobject}/{ext_field}/{quote_plus(ext_value)}"), method="PATCH", json=payload)
@@ -418,58 +685,163 @@ class SalesforceClient:
         # TODO: implement syncing notes to SF
         return True
     
-    def query(self, soql: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def query(
+        self,
+        soql: str,
+        params: Dict[str, Any] = None,
+        *,
+        cache_ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Execute a SOQL query with optional parameters
         
         Handles both string and numeric parameters:
         - Numeric values (int, float) are NOT quoted (for LIMIT, offsets, etc.)
         - String values ARE quoted
         - None values are replaced with NULL keyword
+        
+        With cache_ttl, the response is served from / stored in the persistent
+        response cache (shared across workers and restarts) for that many seconds.
+        Only use it for reference data where that staleness is acceptable.
+        Results with further pages are not cached, since their nextRecordsUrl
+        cursors expire.
         """
         if params:
-            # Parameter substitution for :paramName
-            for key, value in params.items():
-                placeholder = f":{key}"
-                if value is None:
-                    replacement = "NULL"
-                elif isinstance(value, (int, float)):
-                    replacement = str(value)  # Don't quote numbers
-                else:
-                    replacement = f"'{value}'"  # Quote strings
-                soql = soql.replace(placeholder, replacement)
-        return _query(soql)
+            soql = _bind(soql, params)
+        if cache_ttl is None:
+            return _query(soql)
+
+        key = response_cache.make_key(soql)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+        result = _query(soql)
+        if _is_complete(result):
+            response_cache.put(key, orjson.dumps(result), cache_ttl)
+        return result
+
+    def query_all(
+        self,
+        soql: str,
+        params: Dict[str, Any] = None,
+        *,
+        cache_ttl: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """query() that follows nextRecordsUrl and returns every record."""
+        result = self.query(soql, params, cache_ttl=cache_ttl)
+        records = result.get("records", [])
+        while result.get("nextRecordsUrl"):
+            result = _sf(result["nextRecordsUrl"])
+            records.extend(result.get("records", []))
+        return records
+
+    def child_records(self, record: Dict[str, Any], relationship: str) -> List[Dict[str, Any]]:
+        """Every record of a child-relationship subquery block, following its nextRecordsUrl."""
+        block = record.get(relationship) or {}
+        records = list(block.get("records", []))
+        while block.get("nextRecordsUrl"):
+            block = _sf(block["nextRecordsUrl"])
+            records.extend(block.get("records", []))
+        return records
+
+    def iter_query(self, soql: str, params: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """Yield every record of a query, following nextRecordsUrl across pages.
+
+        The request for page N+1 is issued before page N's records are yielded,
+        so the network wait overlaps with the caller's processing.
+        """
+        if params:
+            soql = _bind(soql, params)
+        result = _query(soql)
+        while True:
+            next_url = result.get("nextRecordsUrl")
+            pending = _page_executor.submit(_sf, next_url) if next_url else None
+            yield from result.get("records", [])
+            if pending is None:
+                return
+            result = pending.result()
+
+    async def async_query(self, soql: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """query() on the event loop, so independent queries can run concurrently"""
+        if params:
+            soql = _bind(soql, params)
+        return await _query_async(soql)
+
+    async def async_query_all(self, soql: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """async_query() that follows nextRecordsUrl and returns every record"""
+        result = await self.async_query(soql, params)
+        records = result.get("records", [])
+        while result.get("nextRecordsUrl"):
+            result = await _sf_async(result["nextRecordsUrl"])
+            records.extend(result.get("records", []))
+        return records
     
     def create(self, sobject: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record in Salesforce"""
         return _sf(_api(f"/sobjects/{sobject}/"), method="POST", json=data)
 
+    def create_many(
+        self,
+        sobject: str,
+        records: List[Dict[str, Any]],
+        *,
+        all_or_none: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Create records via the Composite sObject Collections API (200 per request).
+
+        Returns one result ({"id", "success", "errors"}) per input record, in order.
+        """
+        return _sf_composite(sobject, records, all_or_none=all_or_none)
+
     def update(self, sobject: str, record_id: str, data: Dict[str, Any]) -> None:
         """Update an existing Salesforce record."""
         _sf(_api(f"/sobjects/{sobject}/{record_id}"), method="PATCH", json=data)
     
-    def call_apex_rest(self, service_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Call an Apex REST service"""
+    def call_apex_rest(self, service_name: str, data: Dict[str, Any] | bytes) -> Dict[str, Any]:
+        """Call an Apex REST service with a dict or an already JSON-encoded body"""
         path = f"/services/apexrest/{service_name}"
+        if isinstance(data, bytes):
+            return _sf(path, method="POST", content=data)
         return _sf(path, method="POST", json=data)
 
     def describe(self, sobject: str) -> Dict[str, Any]:
-        """Describe metadata for a given sObject, cached for reuse."""
+        """Describe metadata for a given sObject, cached for DESCRIBE_CACHE_TTL seconds.
+
+        The same dict object is returned until the entry expires, so callers
+        can key derived caches on its identity.
+        """
         key = sobject.lower()
         cached = _describe_cache.get(key)
-        if cached:
-            return cached
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
         desc = _sf(_api(f"/sobjects/{sobject}/describe"))
-        _describe_cache[key] = desc
+        _describe_cache[key] = (time.monotonic() + DESCRIBE_CACHE_TTL, desc)
         return desc
+
+
+@functools.lru_cache(maxsize=None)
+def get_sf_client() -> SalesforceClient:
+    """Process-wide SalesforceClient shared by the service classes (also usable with Depends)."""
+    return SalesforceClient()
+
+
 __all__ = [
-    "SFAuthError", "SFError",
+    "SFAuthError", "SFError", "SFCompositeError",
     "query_soql",
+    "is_sf_id",
+    "sf_id18",
     "sobject_get",
     "sobject_update",
+    "sobject_update_many",
     "sobject_upsert_external",
+    "build_person_account_payload",
     "create_person_account",
+    "create_person_accounts",
     "upsert_person_by_uuid",
+    "upsert_people_by_uuid",
     "get_person_account_record_type_id",
     "ingest_encounter",
     "SalesforceClient",
+    "get_sf_client",
+    "close_async_client",
 ]
+
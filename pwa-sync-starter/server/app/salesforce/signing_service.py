@@ -1,16 +1,16 @@
 # server/app/salesforce/signing_service.py
 """Service for querying and completing co-signatures (CM/PS/Manager) from the PWA."""
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from .sf_client import SalesforceClient
+from .sf_client import SalesforceClient, get_sf_client
 
 logger = logging.getLogger("signing_service")
 
 
 class SigningService:
-    def __init__(self):
-        self.sf_client = SalesforceClient()
+    def __init__(self, sf_client: Optional[SalesforceClient] = None):
+        self.sf_client = sf_client or get_sf_client()
 
     def _get_approver_ids(self, user_id: str) -> List[str]:
         """Return the user_id plus any users who delegated approval to them."""
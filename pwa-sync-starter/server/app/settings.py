@@ -53,6 +53,12 @@ class Settings(BaseSettings):
     SYNC_INITIAL_SYNC_RETRY_DELAY_SECONDS: int = 30
     SYNC_ADMIN_TOKEN: Optional[str] = None
 
+    # Request/audit log output (append-only file); stderr when unset
+    AUDIT_LOG_PATH: Optional[str] = None
+    # Root log level for application loggers (written to stderr by a queue listener).
+    # DEBUG also logs full intake, encounter and interaction payloads; opt in locally only
+    LOG_LEVEL: str = "INFO"
+
     # Salesforce sandbox keys
     SF_BENEFITS_JWT_CONSUMER_KEY: Optional[str] = None
     SF_BENEFITS_JWT_USERNAME: Optional[str] = None
@@ -68,6 +74,8 @@ class Settings(BaseSettings):
     # Salesforce shared settings
     SALESFORCE_API_VERSION: str = "v61.0"
     SALESFORCE_PERSON_ACCOUNT_RECORD_TYPE_ID: Optional[str] = None
+    # SQLite file for opt-in persistent caching of Salesforce query responses
+    SF_RESPONSE_CACHE_PATH: str = "data/sf_response_cache.db"
 
     
     # Salesforce object names
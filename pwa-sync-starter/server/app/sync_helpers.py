@@ -7,9 +7,8 @@ from typing import Dict, List, Iterable, Optional
 from .db import DuckClient
 from .settings import settings
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
-from .salesforce.sf_client import query_soql, sobject_update, SFError
+from .salesforce.sf_client import query_soql, sobject_update_many, SFError
 
 def ensure_uuid(val: str | None) -> str:
     """Ensure a valid UUID, generate one if missing"""
@@ -103,16 +102,27 @@ def fetch_accounts(account_ids: Iterable[str]) -> List[dict]:
         )
         return query_soql(fallback_soql).get("records", [])
 
+def _write_back_uuids(sobject: str, updates: List[dict]) -> None:
+    """Write generated UUID__c values back to Salesforce in batched collection requests."""
+    if not updates:
+        return
+    try:
+        results = sobject_update_many(sobject, updates)
+    except Exception as ex:
+        logger.warning("[sync] Failed to write UUID__c back to SF for %s %s records: %s", len(updates), sobject, ex)
+        return
+    for update, result in zip(updates, results):
+        if not result.get("success"):
+            logger.warning("[sync] Failed to write UUID__c back to SF for %s: %s", update["Id"], result.get("errors"))
+
 def upsert_programs(db: DuckClient, rows: List[dict]) -> Dict[str, str]:
     """Upsert programs to database, returns SF ID -> UUID mapping"""
     id_to_uuid: Dict[str, str] = {}
+    uuid_updates: List[dict] = []
     for r in rows:
         p_uuid = ensure_uuid(r.get("UUID__c"))
         if not r.get("UUID__c") and settings.TGTHR_WRITE_MISSING_UUIDS:
-            try:
-                sobject_update(settings.SF_PROGRAM_OBJECT, r["Id"], {"UUID__c": p_uuid})
-            except Exception:
-                pass
+            uuid_updates.append({"Id": r["Id"], "UUID__c": p_uuid})
 
         id_to_uuid[r["Id"]] = p_uuid
 
@@ -123,21 +133,20 @@ def upsert_programs(db: DuckClient, rows: List[dict]) -> Dict[str, str]:
                 name = EXCLUDED.name,
                 last_modified_date = EXCLUDED.last_modified_date
         """, (p_uuid, r.get("Id"), r.get("Name"), r.get("LastModifiedDate")))
+    _write_back_uuids(settings.SF_PROGRAM_OBJECT, uuid_updates)
     return id_to_uuid
 
 def upsert_participants(db: DuckClient, rows: List[dict]) -> Dict[str, str]:
     """Upsert participants to database, returns SF ID -> UUID mapping"""
     id_to_uuid: Dict[str, str] = {}
+    uuid_updates: List[dict] = []
     for a in rows:
         if not a.get("IsPersonAccount"):
             continue
 
         pa_uuid = ensure_uuid(a.get("UUID__c"))
         if not a.get("UUID__c") and settings.TGTHR_WRITE_MISSING_UUIDS:
-            try:
-                sobject_update(settings.SF_ACCOUNT_OBJECT, a["Id"], {"UUID__c": pa_uuid})
-            except Exception:
-                pass
+            uuid_updates.append({"Id": a["Id"], "UUID__c": pa_uuid})
 
         id_to_uuid[a["Id"]] = pa_uuid
 
@@ -162,6 +171,7 @@ def upsert_participants(db: DuckClient, rows: List[dict]) -> Dict[str, str]:
             a.get("PersonBirthdate"),
             a.get("LastModifiedDate"),
         ))
+    _write_back_uuids(settings.SF_ACCOUNT_OBJECT, uuid_updates)
     return id_to_uuid
 
 from typing import Any, Dict, List, Optional
@@ -174,6 +184,7 @@ def upsert_enrollments(
 ) -> Dict[str, str]:
     """Upsert enrollments to database, returns SF ID -> UUID mapping"""
     enr_uuid_by_id: Dict[str, str] = {}
+    uuid_updates: List[Dict[str, Any]] = []
 
     for e in rows:
         # Safely extract required string IDs
@@ -205,12 +216,9 @@ def upsert_enrollments(
         existing_uuid = e.get("UUID__c") if isinstance(e.get("UUID__c"), str) else None
         enr_uuid = ensure_uuid(existing_uuid)
 
-        # Optionally write back the UUID to SF if missing
+        # Optionally write back the UUID to SF if missing (sent in one batch after the loop)
         if not existing_uuid and settings.TGTHR_WRITE_MISSING_UUIDS:
-            try:
-                sobject_update(settings.SF_PROGRAM_ENROLLMENT_OBJECT, sf_enr_id, {"UUID__c": enr_uuid})
-            except Exception as ex:
-                logger.warning("[sync] Failed to write UUID__c back to SF for %s: %s", sf_enr_id, ex)
+            uuid_updates.append({"Id": sf_enr_id, "UUID__c": enr_uuid})
 
         enr_uuid_by_id[sf_enr_id] = enr_uuid
 
@@ -245,6 +253,7 @@ def upsert_enrollments(
             ),
         )
 
+    _write_back_uuids(settings.SF_PROGRAM_ENROLLMENT_OBJECT, uuid_updates)
     return enr_uuid_by_id
 
 def _extract_first_name(account: dict) -> str | None:
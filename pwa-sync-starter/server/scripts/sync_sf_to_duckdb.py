@@ -7,10 +7,13 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from server.app.logging_setup import setup_logging
 from server.app.sync_runner import run_full_sync
 
 def main():
     """Main entry point for sync script - delegates to sync_runner"""
+    # main.py configures logging for the server; the CLI needs its own handler
+    setup_logging()
     try:
         result = run_full_sync()
         print(f"[sync] Sync completed successfully: {result}")